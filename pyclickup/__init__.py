@@ -1,4 +1,35 @@
 """
 pyclickup main entrypoint for the library
 """
-from pyclickup.models.client import ClickUp  # noqa
+import sys
+from importlib import import_module
+from typing import Any
+
+
+# exports are imported on first access (PEP 562), so importing pyclickup
+# doesn't pay for the client and its dependencies until they're used
+_EXPORTS = {
+    "ClickUp": "pyclickup.models.client",
+    "TaskQuery": "pyclickup.models.query",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """lazily imports the public exports"""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'pyclickup' has no attribute '{name}'")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    # the pyclickup.globals submodule shadows the globals() builtin here
+    setattr(sys.modules[__name__], name, value)
+    return value
+
+
+def __dir__() -> list:
+    """includes the lazy exports"""
+    return sorted(set(vars(sys.modules[__name__])) | set(_EXPORTS))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # module __getattr__ is 3.7+, so older pythons import eagerly
+    from pyclickup.models.client import ClickUp  # noqa
+    from pyclickup.models.query import TaskQuery  # noqa
@@ -0,0 +1,308 @@
+"""
+command line interface
+
+    pyclickup export --team 123 --status open --format csv -o tasks.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import datetime
+from pyclickup.globals import API_URL, LIBRARY
+from pyclickup.utils.text import flat_task
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional  # noqa
+
+
+FORMATS = ["ndjson", "csv", "parquet"]
+COLUMNS = [
+    "id",
+    "name",
+    "status",
+    "status_type",
+    "priority",
+    "team_id",
+    "space_id",
+    "project_id",
+    "list_id",
+    "parent",
+    "assignees",
+    "tags",
+    "creator_id",
+    "date_created",
+    "date_updated",
+    "date_closed",
+    "due_date",
+    "start_date",
+    "url",
+]
+INT_COLUMNS = {
+    "priority",
+    "creator_id",
+    "date_created",
+    "date_updated",
+    "date_closed",
+    "due_date",
+    "start_date",
+}
+PARQUET_ROW_GROUP = 10_000
+
+
+def task_row(task: Any) -> Dict[str, Any]:
+    """the flat COLUMNS of a task, from its raw payload"""
+    fields = flat_task(task._payload)
+    row = {x: fields[x] for x in COLUMNS}
+    row["assignees"] = ";".join(str(x) for x in fields["assignees"])
+    row["tags"] = ";".join(fields["tags"])
+    return row
+
+
+class _Counted:
+    """a text sink over a binary stream, counting the bytes written"""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        """constructor"""
+        self.stream = stream
+        self.bytes = 0
+
+    def write(self, text: str) -> int:
+        """encodes and writes text"""
+        data = text.encode("utf-8")
+        self.bytes += len(data)
+        self.stream.write(data)
+        return len(text)
+
+
+class NdjsonWriter:
+    """one raw task payload per line"""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        """constructor"""
+        self.out = _Counted(stream)
+
+    def write(self, task: Any) -> None:
+        """writes a task"""
+        self.out.write(task._json + "\n")
+
+    def close(self) -> int:
+        """flushes, returning the bytes written"""
+        self.out.stream.flush()
+        return self.out.bytes
+
+
+class CsvWriter:
+    """the flat task COLUMNS, with a header row"""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        """constructor"""
+        self.out = _Counted(stream)
+        self.writer = csv.DictWriter(self.out, fieldnames=COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, task: Any) -> None:
+        """writes a task"""
+        self.writer.writerow(task_row(task))
+
+    def close(self) -> int:
+        """flushes, returning the bytes written"""
+        self.out.stream.flush()
+        return self.out.bytes
+
+
+class ParquetWriter:
+    """the flat task COLUMNS, one row group per PARQUET_ROW_GROUP tasks"""
+
+    def __init__(self, path: str, row_group: int = PARQUET_ROW_GROUP) -> None:
+        """constructor, needs pyarrow"""
+        try:
+            import pyarrow  # type: ignore # pylint: disable=import-outside-toplevel
+            import pyarrow.parquet  # type: ignore # noqa # pylint: disable=import-outside-toplevel
+        except ImportError:
+            raise Exception("parquet output needs pyarrow, pip install pyarrow")
+        self.pyarrow = pyarrow
+        self.path = path
+        self.row_group = row_group
+        self.schema = pyarrow.schema(
+            [
+                (x, pyarrow.int64() if x in INT_COLUMNS else pyarrow.string())
+                for x in COLUMNS
+            ]
+        )
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.rows = []  # type: List[Dict[str, Any]]
+
+    def _flush(self) -> None:
+        """writes the buffered rows as a row group"""
+        if self.rows:
+            self.writer.write_table(
+                self.pyarrow.Table.from_pylist(self.rows, schema=self.schema)
+            )
+            self.rows = []
+
+    def write(self, task: Any) -> None:
+        """buffers a task, writing a row group when it's full"""
+        self.rows.append(task_row(task))
+        if len(self.rows) >= self.row_group:
+            self._flush()
+
+    def close(self) -> int:
+        """writes the last row group, returning the file size"""
+        self._flush()
+        self.writer.close()
+        return os.path.getsize(self.path)
+
+
+def _timestamp(value: str) -> Any:
+    """posix x1000 timestamps, or YYYY-MM-DD[THH:MM:SS] dates"""
+    if value.isdigit():
+        return int(value)
+    for pattern in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, pattern)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"invalid timestamp '{value}'")
+
+
+def _team_for(client: Any, args: argparse.Namespace) -> str:
+    """the team to search, looked up from the hierarchy if it wasn't given"""
+    if args.team:
+        return args.team
+    teams = client.teams
+    wanted = set(args.space + args.project + args.list)
+    if not wanted:
+        if len(teams) != 1:
+            raise Exception("this token has several teams, pick one with --team")
+        return teams[0].id
+    for team in client.load_hierarchy():
+        for space in team.spaces:
+            ids = {space.id}
+            for project in space.projects:
+                ids |= {project.id} | {x.id for x in project.lists}
+            if ids & wanted:
+                return team.id
+    raise Exception(f"couldn't find the team of {', '.join(sorted(wanted))}")
+
+
+def _filters(args: argparse.Namespace) -> Dict[str, Any]:
+    """the _get_tasks filters from the export arguments"""
+    filters = {
+        "space_ids": args.space,
+        "project_ids": args.project,
+        "list_ids": args.list,
+        "statuses": args.status,
+        "assignees": args.assignee,
+        "order_by": args.order_by,
+        "reverse": args.reverse or None,
+        "subtasks": args.subtasks or None,
+        "include_closed": args.include_closed,
+        "date_created_gt": args.created_after,
+        "date_created_lt": args.created_before,
+        "date_updated_gt": args.updated_after,
+        "date_updated_lt": args.updated_before,
+        "due_date_gt": args.due_after,
+        "due_date_lt": args.due_before,
+    }
+    return {x: y for x, y in filters.items() if y not in (None, [])}
+
+
+def _size(count: float) -> str:
+    """a human readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024 or unit == "GB":
+            break
+        count /= 1024
+    return f"{count:.1f} {unit}"
+
+
+def export(args: argparse.Namespace) -> int:
+    """streams tasks to ndjson, csv or parquet, reporting throughput"""
+    from pyclickup.models.client import (  # pylint: disable=import-outside-toplevel
+        ClickUp,
+    )
+
+    if not args.token:
+        raise Exception("no token, pass --token or set CLICKUP_TOKEN")
+    if args.format == "parquet" and args.output == "-":
+        raise Exception("parquet output needs a file, pass --output")
+    client = ClickUp(args.token, api_url=args.api_url, max_workers=args.workers)
+    started = time.perf_counter()
+    stream = None
+    try:
+        team_id = _team_for(client, args)
+        tasks = client._iter_all_tasks(
+            team_id,
+            page_limit=args.page_limit,
+            shards=args.shards,
+            prefetch=0 if args.shards else args.workers,
+            **_filters(args),
+        )
+        if args.format == "parquet":
+            writer = ParquetWriter(args.output)  # type: Any
+        else:
+            stream = (
+                sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+            )
+            writer = (NdjsonWriter if args.format == "ndjson" else CsvWriter)(stream)
+        count = 0
+        for task in tasks:
+            writer.write(task)
+            count += 1
+        size = writer.close()
+    finally:
+        if stream is not None and stream is not sys.stdout.buffer:
+            stream.close()
+        client.close()
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"exported {count} tasks ({_size(size)}) in {elapsed:.2f}s, "
+        f"{count / elapsed:.1f} tasks/s, {_size(size / elapsed)}/s",
+        file=sys.stderr,
+    )
+    return count
+
+
+def parser() -> argparse.ArgumentParser:
+    """the argument parser"""
+    root = argparse.ArgumentParser(prog=LIBRARY, description="ClickUp tools")
+    commands = root.add_subparsers(dest="command")
+    command = commands.add_parser("export", help="stream tasks to a file")
+    command.set_defaults(run=export)
+    command.add_argument("--token", default=os.environ.get("CLICKUP_TOKEN"))
+    command.add_argument("--api-url", default=API_URL)
+    command.add_argument("--format", choices=FORMATS, default="ndjson")
+    command.add_argument("-o", "--output", default="-", help="a file, or - for stdout")
+    command.add_argument("--workers", type=int, default=4, help="pages in flight")
+    command.add_argument(
+        "--shards", type=int, default=0, help="crawl date_created ranges in parallel"
+    )
+    command.add_argument("--page-limit", type=int, default=-1)
+    command.add_argument("--team", help="defaults to the token's only team")
+    for name in ("space", "project", "list", "status", "assignee"):
+        command.add_argument(f"--{name}", action="append", default=[])
+    command.add_argument("--order-by", choices=["id", "created", "updated", "due_date"])
+    command.add_argument("--reverse", action="store_true")
+    command.add_argument("--subtasks", action="store_true")
+    command.add_argument("--include-closed", action="store_true")
+    for name in ("created", "updated", "due"):
+        for side in ("after", "before"):
+            command.add_argument(f"--{name}-{side}", type=_timestamp)
+    return root
+
+
+def main(argv: List[str] = None) -> int:
+    """console entrypoint"""
+    args = parser().parse_args(argv)
+    if not args.command:
+        parser().print_help()
+        return 2
+    try:
+        args.run(args)
+    except Exception as error:  # pylint: disable=broad-except
+        print(f"{LIBRARY}: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
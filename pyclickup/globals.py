@@ -8,6 +8,19 @@ __version__ = "0.1.4"
 
 LIBRARY = "pyclickup"
 API_URL = "https://api.clickup.com/api/v1/"
+MAX_URL_LENGTH = 2000
+TASK_PAGE_SIZE = 100
+CLICKUP_EPOCH = 1483228800000  # 2017-01-01, no task was created before this
+MIN_SHARD_MS = 1000
+RATE_LIMIT_BACKOFF = 1.0  # seconds, multiplied by the attempt number
+HEDGE_BUDGET = 0.05  # hedged requests may add at most this share of extra load
+
+
+# (connect, read) timeouts in seconds, per endpoint with ids replaced by *
+DEFAULT_TIMEOUT = (3.05, 30.0)
+ENDPOINT_TIMEOUTS = {
+    "team/*/task": (3.05, 60.0),
+}
 
 
 TEST_API_URL = "https://private-anon-efe850a7d7-clickup.apiary-mock.com/api/v1/"
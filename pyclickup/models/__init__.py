@@ -5,9 +5,13 @@ import json
 from datetime import datetime
 from pyclickup.globals import DEFAULT_STATUSES, LIBRARY
 from pyclickup.models.error import MissingClient
+from pyclickup.utils.serialize import pack_payloads, unpack_payloads
 from pyclickup.utils.text import snakeify, ts_to_datetime, datetime_to_ts
-from requests.models import Response
-from typing import Any, Dict, List as ListType, Union  # noqa
+from typing import Any, Dict, Iterator, List as ListType, TYPE_CHECKING, Union  # noqa
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests.models import Response  # noqa
 
 
 class BaseModel:
@@ -17,12 +21,77 @@ class BaseModel:
         """constructor"""
         self.id = None  # pylint: disable=invalid-name
         self._data = {**data, **kwargs}
-        self._json = self._jsond(data)
         self._client = client
 
         for key in self._data:
             setattr(self, snakeify(key), self._data[key])
 
+    @property
+    def _json(self) -> str:
+        """the raw payload as json"""
+        return self._jsond(self._payload)
+
+    @property
+    def _payload(self) -> dict:
+        """the raw api payload, without the client or any parent models"""
+        return {
+            key: value
+            for key, value in self._data.items()
+            if not isinstance(value, BaseModel)
+        }
+
+    def __getstate__(self) -> dict:
+        """
+        pickles the parsed model without its client or parent models, so a
+        single task or list doesn't drag the whole hierarchy along.
+        use attach() to set a client again once loaded
+        """
+        parents = [x for x, y in self._data.items() if isinstance(y, BaseModel)]
+        state = {
+            key: value
+            for key, value in self.__dict__.items()
+            if key != "_client" and key not in parents
+        }
+        state["_data"] = self._payload
+        state["_parents"] = parents
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """restores a pickled model, relinking any children to it"""
+        parents = state.pop("_parents", [])
+        self.__dict__.update(state)
+        self._client = None
+        for key in parents:
+            setattr(self, key, None)
+        name = type(self).__name__.lower()
+        for value in state.values():
+            nested = value if isinstance(value, list) else [value]
+            for model in nested:
+                if isinstance(model, BaseModel) and getattr(model, name, 0) is None:
+                    setattr(model, name, self)
+                    model._data[name] = self
+
+    def attach(self, client: Any) -> "BaseModel":
+        """sets the client on this model and any models nested in it"""
+        self._client = client
+        for value in self.__dict__.values():
+            nested = value if isinstance(value, list) else [value]
+            for model in nested:
+                if isinstance(model, BaseModel) and model._client is not client:
+                    model.attach(client)
+        return self
+
+    def _set(self, key: str, value: Any, raw: Any = None) -> None:
+        """
+        sets a parsed attribute along with its raw payload value (the
+        attribute's value unless given), under the payload's own spelling
+        of the key if it has one
+        """
+        name = snakeify(key)
+        setattr(self, name, value)
+        key = next((x for x in self._data if snakeify(x) == name), key)
+        self._data[key] = value if raw is None else raw
+
     def _jsond(self, json_data: dict) -> str:
         """json dumps"""
         return json.dumps(json_data)
@@ -66,12 +135,25 @@ class List(BaseModel):
         """repr"""
         return f"<{LIBRARY}.List[{self.id}] '{self.name}'>"
 
-    def rename(self, new_name: str) -> Response:
-        """renames a list"""
+    def rename(self, new_name: str) -> Union[list, dict, "Response"]:
+        """
+        renames a list. in write-behind mode the rename is journaled, and
+        the list is renamed once the journal has sent it successfully
+        """
         if not self._client:
             raise MissingClient()
-        rename_call = self._client.put(f"list/{self.id}", data={"name": new_name})
-        self.name = new_name
+        client = self._client
+        path, data = f"list/{self.id}", {"name": new_name}
+        if client.journal is not None:
+
+            def sent(entry: Dict[str, Any]) -> None:
+                if entry.get("state") == "done":
+                    self._set("name", new_name)
+
+            entry_id = client.journal.append("put", path, {"data": data}, callback=sent)
+            return {"id": None, "queued": entry_id}
+        rename_call = client.put(path, data=data)
+        self._set("name", new_name)
         return rename_call
 
     def get_tasks(self, **kwargs) -> ListType["Task"]:
@@ -90,6 +172,14 @@ class List(BaseModel):
             self.project.space.team.id, list_ids=[self.id], **kwargs  # type: ignore
         )
 
+    def iter_all_tasks(self, **kwargs) -> Iterator["Task"]:
+        """streams every task for this list"""
+        if not self._client:
+            raise MissingClient()
+        return self._client.iter_all_tasks(
+            self.project.space.team.id, list_ids=[self.id], **kwargs  # type: ignore
+        )
+
     def create_task(
         self,
         name: str,  # string
@@ -98,13 +188,14 @@ class List(BaseModel):
         status: str = "Open",  # needs to match your given statuses for the list
         priority: int = 0,  # default to no priority (0). check Task class for enum
         due_date: Union[int, datetime] = None,  # integer posix time, or python datetime
-    ) -> Union[list, dict, Response]:
+    ) -> Union[list, dict, "Response"]:
         """
         creates a task within this list, returning the id of the task.
 
         unfortunately right now, there is no way to retreive a task by id
         this will return the ID of the newly created task,
-        but you'll need to re-query the list for tasks to get the task object
+        but you'll need to re-query the list for tasks to get the task object.
+        in write-behind mode, this returns {"id": None, "queued": <entry id>}
         """
         if not self._client:
             raise MissingClient()
@@ -128,8 +219,20 @@ class List(BaseModel):
             task_data["priority"] = priority
 
         new_task_call = self._client.post(f"list/{self.id}/task", data=task_data)
+        if new_task_call.get("queued") is not None:
+            return new_task_call
         return new_task_call["id"]
 
+    def create_tasks(self, tasks: ListType[Dict[str, Any]]) -> ListType[Any]:
+        """
+        creates many tasks in parallel, given keyword arguments for
+        create_task, returning the new ids (or queued entries, in
+        write-behind mode) in the same order
+        """
+        if not self._client:
+            raise MissingClient()
+        return self._client._pmap(lambda x: self.create_task(**x), tasks)
+
 
 class Project(BaseModel):
     """project model"""
@@ -182,6 +285,12 @@ class Project(BaseModel):
             self.space.team.id, project_ids=[self.id], **kwargs
         )
 
+    def iter_all_tasks(self, **kwargs):
+        """streams all of the tasks for the project"""
+        return self._client.iter_all_tasks(
+            self.space.team.id, project_ids=[self.id], **kwargs
+        )
+
 
 class Space(BaseModel):
     """space model"""
@@ -202,10 +311,13 @@ class Space(BaseModel):
     def projects(self):
         """get the list of projects in the space"""
         if not self._projects or not self._client.cache:
-            self._projects = [
-                Project(x, client=self._client, space=self)
-                for x in self._client.get(f"space/{self.id}/project")["projects"]
-            ]
+            self._projects = self._client._flight.do(
+                ("model", "projects", id(self)),
+                lambda: [
+                    Project(x, client=self._client, space=self)
+                    for x in self._client.get(f"space/{self.id}/project")["projects"]
+                ],
+            )
         return self._projects
 
     def get_project(self, project_id: str) -> Project:
@@ -224,6 +336,10 @@ class Space(BaseModel):
         """gets all the tasks for the space"""
         return self._client._get_all_tasks(self.team.id, space_ids=[self.id], **kwargs)
 
+    def iter_all_tasks(self, **kwargs):
+        """streams all the tasks for the space"""
+        return self._client.iter_all_tasks(self.team.id, space_ids=[self.id], **kwargs)
+
 
 class Team(BaseModel):
     """team object"""
@@ -242,10 +358,13 @@ class Team(BaseModel):
     def spaces(self):
         """gets a list of all the spaces in this team"""
         if not self._spaces or not self._client.cache:
-            self._spaces = [
-                Space(x, client=self._client, team=self)
-                for x in self._client.get(f"team/{self.id}/space")["spaces"]
-            ]
+            self._spaces = self._client._flight.do(
+                ("model", "spaces", id(self)),
+                lambda: [
+                    Space(x, client=self._client, team=self)
+                    for x in self._client.get(f"team/{self.id}/space")["spaces"]
+                ],
+            )
         return self._spaces
 
     def get_space(self, space_id: str) -> Space:
@@ -264,6 +383,14 @@ class Team(BaseModel):
         """gets all of the tasks for the team"""
         return self._client._get_all_tasks(self.id, **kwargs)
 
+    def iter_all_tasks(self, **kwargs):
+        """streams all of the tasks for the team"""
+        return self._client.iter_all_tasks(self.id, **kwargs)
+
+    def query_tasks(self, query, **kwargs):
+        """streams the tasks in this team matching a TaskQuery"""
+        return self._client.query_tasks(self.id, query, **kwargs)
+
 
 class Tag(BaseModel):
     """Tag object"""
@@ -317,8 +444,11 @@ class Task(BaseModel):
         status: str = None,  # string
         priority: int = None,  # integer
         due_date: Union[int, datetime] = None,  # integer posix time, or python datetime
-    ) -> Union[list, dict, Response]:
-        """updates the task"""
+    ) -> Union[list, dict, "Response"]:
+        """
+        updates the task. in write-behind mode, the task changes once the
+        journal has sent the update successfully
+        """
         if not self._client:
             raise MissingClient()
         if not add_assignees:
@@ -346,4 +476,56 @@ class Task(BaseModel):
                 due_date if isinstance(due_date, int) else datetime_to_ts(due_date)
             )
 
-        return self._client.put(path, data=data)
+        client = self._client
+        if client.journal is not None:
+            # write-behind: applied once the journal has sent it successfully
+            def sent(entry: Dict[str, Any]) -> None:
+                if entry.get("state") == "done":
+                    self._updated(data, add_assignees, due_date)
+                    client._notify(self)
+
+            entry_id = client.journal.append("put", path, {"data": data}, callback=sent)
+            return {"id": None, "queued": entry_id}
+        response = self._client.put(path, raw=True, data=data)
+        if response.status_code < 400:
+            self._updated(data, add_assignees, due_date)
+            self._client._notify(self)
+        return response.json()
+
+    def _updated(
+        self,
+        data: Dict[str, Any],
+        added: ListType[Union[int, User]],
+        due_date: Union[int, datetime, None],
+    ) -> None:
+        """
+        applies a successful update to this task, to the parsed attributes
+        and the raw payload alike
+        """
+        for key in ("name", "content", "priority"):
+            if key in data:
+                self._set(key, data[key])
+        if "status" in data:
+            status = {**self.status._payload, "status": data["status"]}
+            self._set("status", Status(status, client=self._client), status)
+        if due_date:
+            parsed = (
+                due_date if isinstance(due_date, datetime) else ts_to_datetime(due_date)
+            )
+            self._set("dueDate", parsed, str(data["due_date"]))
+        removed = set(data["assignees"]["rem"])
+        assignees = [x for x in self.assignees if x.id not in removed] + [
+            x if isinstance(x, User) else User({"id": x}, client=self._client)
+            for x in added
+        ]
+        self._set("assignees", assignees, [x._payload for x in assignees])
+
+
+def dump_tasks(tasks: ListType[Task]) -> bytes:
+    """exports tasks as a compact binary blob of their raw payloads"""
+    return pack_payloads([x._payload for x in tasks])
+
+
+def load_tasks(blob: bytes, client: Any = None) -> ListType[Task]:
+    """imports tasks exported with dump_tasks, optionally attaching a client"""
+    return [Task(x, client=client) for x in unpack_payloads(blob)]
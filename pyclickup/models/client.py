@@ -1,15 +1,55 @@
 """
 base client model to create and use http endpoints
 """
-import requests
+import json
+import threading
+import time
 import urllib.parse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import quote
 from datetime import datetime
-from requests.models import Response
-from pyclickup.globals import __version__, API_URL, LIBRARY, TEST_TOKEN, TEST_API_URL
+from pyclickup.globals import (
+    __version__,
+    API_URL,
+    CLICKUP_EPOCH,
+    DEFAULT_TIMEOUT,
+    ENDPOINT_TIMEOUTS,
+    HEDGE_BUDGET,
+    LIBRARY,
+    MAX_URL_LENGTH,
+    MIN_SHARD_MS,
+    RATE_LIMIT_BACKOFF,
+    TASK_PAGE_SIZE,
+    TEST_TOKEN,
+    TEST_API_URL,
+)
 from pyclickup.models import User, Task, Team
 from pyclickup.models.error import RateLimited
-from pyclickup.utils.text import datetime_to_ts, filter_locals
-from typing import Any, Dict, List, Optional, Union  # noqa
+from pyclickup.models.query import TaskQuery
+from pyclickup.utils.concurrency import (
+    AdaptiveLimiter,
+    HedgeBudget,
+    interleave,
+    LatencyTracker,
+    RateLimiter,
+    SingleFlight,
+)
+from pyclickup.utils.text import datetime_to_ts, endpoint_key, filter_locals
+from typing import (  # noqa
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TYPE_CHECKING,
+    Union,
+)
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests.models import Response  # noqa
 
 
 class ClickUp:
@@ -31,6 +71,15 @@ class ClickUp:
         cache: bool = True,
         debug: bool = False,
         user_agent: str = f"{LIBRARY}/{__version__}",
+        max_workers: int = 4,
+        rate_limit: int = None,
+        adaptive: bool = False,
+        retries: int = 3,
+        http2: bool = False,
+        timeouts: Dict[str, Any] = None,  # endpoint -> (connect, read) seconds
+        hedge: bool = False,
+        hedge_budget: float = HEDGE_BUDGET,
+        journal: str = None,  # sqlite path, queue posts and puts there (write-behind)
     ) -> None:
         """creates a new client"""
         if not token:
@@ -41,6 +90,29 @@ class ClickUp:
         self.cache = cache
         self.debug = debug
         self.user_agent = user_agent
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.limiter = AdaptiveLimiter(maximum=max_workers) if adaptive else None
+        self.retries = retries
+        self.http2 = http2
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self.hedge = hedge
+        self.hedge_budget = HedgeBudget(hedge_budget)
+        self.latencies = LatencyTracker()
+        self.rate_remaining = None  # type: Optional[int]
+        self._hedge_pool = None  # type: Optional[ThreadPoolExecutor]
+        self._timeout_errors = ()  # type: tuple
+        self._flight = SingleFlight()
+        self._transport = None  # type: Any
+        self._transport_lock = threading.Lock()
+        self._listeners = []  # type: List[Callable[[Task], Any]]
+        self.journal = None  # type: Any
+        if journal:
+            from pyclickup.models.journal import (  # pylint: disable=import-outside-toplevel
+                Journal,
+            )
+
+            self.journal = Journal(self, journal, max_workers=max_workers)
 
         # cache
         self._user = None  # type: Optional[User]
@@ -56,23 +128,120 @@ class ClickUp:
             "User-Agent": self.user_agent,
         }
 
+    @property
+    def transport(self) -> Any:
+        """the pooled http session, built on first use"""
+        if self._transport is None:
+            with self._transport_lock:
+                if self._transport is None:
+                    self._transport = self._build_transport()
+        return self._transport
+
+    def _build_transport(self) -> Any:
+        """
+        a requests session pooling up to max_workers http/1.1 connections,
+        or with http2=True an httpx client multiplexing requests over one
+        http/2 connection
+        """
+        # pylint: disable=import-outside-toplevel
+        # imported here rather than at the top so `import pyclickup` stays fast
+        if self.http2:
+            try:
+                import httpx
+            except ImportError:
+                raise Exception("http2 requires httpx, pip install httpx[http2]")
+            self._timeout_errors = (httpx.TimeoutException,)
+            return httpx.Client(http2=True)
+        import requests
+        import requests.adapters
+
+        self._timeout_errors = (requests.exceptions.Timeout,)
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.max_workers
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self) -> None:
+        """sends anything journaled, then closes any pooled connections"""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        with self._transport_lock:
+            if self._hedge_pool is not None:
+                self._hedge_pool.shutdown(wait=True)
+                self._hedge_pool = None
+            if self._transport is not None:
+                self._transport.close()
+                self._transport = None
+
     @property
     def user(self) -> User:
         """get the user associated with this token"""
         if not self._user or not self.cache:
-            self._user = User(self.get("user"), client=self)  # type: ignore
+            self._user = self._flight.do(
+                ("model", "user"),
+                lambda: User(self.get("user"), client=self),  # type: ignore
+            )
         return self._user
 
     @property
     def teams(self) -> List[Team]:
         """get authorized teams"""
         if not self._teams or not self.cache:
-            teams_data = self.get("team")
-            if not isinstance(teams_data, dict):
-                raise Exception("invalid response while looking up teams")
-            self._teams = [Team(x, client=self) for x in teams_data["teams"]]
+            self._teams = self._flight.do(("model", "teams"), self._load_teams)
         return self._teams
 
+    def _load_teams(self) -> List[Team]:
+        """fetches the authorized teams"""
+        teams_data = self.get("team")
+        if not isinstance(teams_data, dict):
+            raise Exception("invalid response while looking up teams")
+        return [Team(x, client=self) for x in teams_data["teams"]]
+
+    @property
+    def concurrency_metrics(self) -> Optional[Dict[str, Any]]:
+        """the adaptive concurrency limit and its history, if adaptive"""
+        return self.limiter.metrics() if self.limiter else None
+
+    def load_hierarchy(self) -> List[Team]:
+        """loads every team, space and project, each level in parallel"""
+        teams = self.teams
+        workers = self.max_workers
+        load_spaces = [lambda x=x: x.spaces for x in teams]
+        spaces = list(interleave(load_spaces, workers))
+        load_projects = [lambda x=x: x.projects for x in spaces]
+        list(interleave(load_projects, workers))
+        return teams
+
+    def _pmap(self, function: Any, items: List[Any]) -> List[Any]:
+        """maps function over items on the client's workers, keeping order"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(function, items))
+
+    def update_tasks(self, updates: List[Any]) -> List[Any]:
+        """
+        applies many task updates in parallel, given (task, changes) pairs
+        where changes are keyword arguments for Task.update
+        """
+        return self._pmap(lambda x: x[0].update(**x[1]), updates)
+
+    def subscribe(self, listener: Callable[[Task], Any]) -> None:
+        """calls listener with each task after a successful Task.update"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Task], Any]) -> None:
+        """stops calling listener"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, task: Task) -> None:
+        """tells the listeners that a task changed"""
+        for listener in list(self._listeners):
+            listener(task)
+
     def get_team_by_id(self, team_id: str) -> Team:
         """given an team_id, return the team if it exists"""
         team_data = self.get(f"team/{team_id}")
@@ -86,33 +255,123 @@ class ClickUp:
             return
         print(*args)
 
-    def _req(self, path: str, method: str = "get", **kwargs: Any) -> Response:
+    def _timeout(self, endpoint: str) -> Any:
+        """the (connect, read) timeout for an endpoint, in the transport's terms"""
+        connect, read = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        if self.http2:
+            import httpx  # pylint: disable=import-outside-toplevel
+
+            return httpx.Timeout(read, connect=connect)
+        return (connect, read)
+
+    def _send(self, endpoint: str, method: str, url: str, kwargs: dict) -> "Response":
+        """makes a single request, feeding the limiters and latency tracker"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        started = self.limiter.acquire() if self.limiter else time.monotonic()
+        rate_limited = False
+        try:
+            request = self.transport.request(
+                method, url, headers=self.headers, **kwargs
+            )
+            rate_limited = request.status_code == 429
+            remaining = request.headers.get("X-RateLimit-Remaining")
+            if remaining is not None and remaining.isdigit():
+                self.rate_remaining = int(remaining)
+            if not rate_limited:
+                self.latencies.record(endpoint, time.monotonic() - started)
+            return request
+        finally:
+            if self.limiter:
+                self.limiter.release(started, rate_limited=rate_limited)
+
+    def _hedged(self, endpoint: str, method: str, url: str, kwargs: dict) -> "Response":
+        """
+        sends the request, and if it hasn't answered by the endpoint's p95
+        latency, sends a duplicate, keeping whichever response lands first.
+        duplicates are capped by the hedge budget
+        """
+        self.hedge_budget.spend()
+        delay = self.latencies.percentile(endpoint)
+        if delay is None:
+            return self._send(endpoint, method, url, kwargs)
+        if self._hedge_pool is None:
+            with self._transport_lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers * 2
+                    )
+        first = self._hedge_pool.submit(self._send, endpoint, method, url, kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done or not self.hedge_budget.allow():
+            return first.result()
+        self._log(f"[HEDGE]: {url}")
+        second = self._hedge_pool.submit(self._send, endpoint, method, url, kwargs)
+        done, pending = wait([first, second], return_when=FIRST_COMPLETED)
+        # both may have finished, so prefer one that didn't fail
+        winner = next((x for x in done if x.exception() is None), None)
+        if winner is None:
+            winner = pending.pop() if pending else done.pop()
+        return winner.result()
+
+    def _req(self, path: str, method: str = "get", **kwargs: Any) -> "Response":
         """requests wrapper"""
         full_path = urllib.parse.urljoin(self.api_url, path)
         self._log(f"[{method.upper()}]: {full_path}")
-        request = requests.request(method, full_path, headers=self.headers, **kwargs)
-        if request.status_code == 429:
-            raise RateLimited()
-        return request
+        endpoint = endpoint_key(path)
+        kwargs.setdefault("timeout", self._timeout(endpoint))
+        idempotent = method.lower() == "get"
+        send = self._hedged if idempotent and self.hedge else self._send
+        attempts = self.retries + 1 if self.limiter or idempotent else 1
+        for attempt in range(attempts):
+            try:
+                request = send(endpoint, method, full_path, kwargs)
+            except self._timeout_errors:
+                if not idempotent or attempt + 1 == attempts:
+                    raise
+                self._log(f"[TIMEOUT]: {full_path}")
+                continue
+            if request.status_code != 429:
+                return request
+            if not self.limiter:
+                break
+            if attempt + 1 < attempts:
+                time.sleep(RATE_LIMIT_BACKOFF * (attempt + 1))
+        raise RateLimited()
 
     def get(
         self, path: str, raw: bool = False, **kwargs: Any
-    ) -> Union[list, dict, Response]:
-        """makes a get request to the API"""
-        request = self._req(path, **kwargs)
-        return request if raw else request.json()
+    ) -> Union[list, dict, "Response"]:
+        """
+        makes a get request to the API. identical concurrent gets share one
+        request and one parsed result, so treat that result as read-only
+        """
+        if raw:
+            return self._req(path, **kwargs)
+        key = ("get", path, repr(sorted(kwargs.items())))
+        return self._flight.do(key, lambda: self._req(path, **kwargs).json())
 
     def post(
         self, path: str, raw: bool = False, **kwargs: Any
-    ) -> Union[list, dict, Response]:
-        """makes a post request to the API"""
+    ) -> Union[list, dict, "Response"]:
+        """
+        makes a post request to the API. in write-behind mode it's journaled
+        instead, returning {"id": None, "queued": <journal entry id>}
+        """
+        if self.journal is not None and not raw:
+            return {"id": None, "queued": self.journal.append("post", path, kwargs)}
         request = self._req(path, method="post", **kwargs)
         return request if raw else request.json()
 
     def put(
         self, path: str, raw: bool = False, **kwargs: Any
-    ) -> Union[list, dict, Response]:
-        """makes a put request to the API"""
+    ) -> Union[list, dict, "Response"]:
+        """
+        makes a put request to the API. in write-behind mode it's journaled
+        instead, returning {"id": None, "queued": <journal entry id>}
+        """
+        if self.journal is not None and not raw:
+            return {"id": None, "queued": self.journal.append("put", path, kwargs)}
         request = self._req(path, method="put", **kwargs)
         return request if raw else request.json()
 
@@ -135,42 +394,290 @@ class ClickUp:
         date_created_lt: int = None,  # integer, posix time
         date_updated_gt: int = None,  # integer, posix time
         date_updated_lt: int = None,  # integer, posix time
+        raw: bool = False,  # bool, return the response rather than tasks
         **kwargs: Any,
-    ) -> List[Task]:
+    ) -> Any:
         """fetches the tasks according to the given options"""
-        params = filter_locals(locals(), extras=["team_id"])
-
-        for option in self.task_boolean_options:
-            if option in params:
-                params[option] = str(params[option]).lower()
-
-        options = [
-            "{}{}={}".format(  # pylint: disable=consider-using-f-string
-                x,
-                "[]" if x in self.task_list_options else "",
-                ",".join(params[x]) if x in self.task_list_options else params[x],
-            )
-            for x in params
-        ]
-        opts = "&".join(options)
-        path = f"team/{team_id}/task?{opts}"
+        params = filter_locals(locals(), extras=["team_id", "raw"])
+        path = self._task_path(team_id, params)
+        if raw:
+            return self.get(path, raw=True)
         task_list = self.get(path)
         if not isinstance(task_list, dict):
             return []
         return [Task(x, client=self) for x in task_list["tasks"]]
 
-    def _get_all_tasks(
-        self, team_id: str, page_limit: int = -1, **kwargs: Any
-    ) -> List[Task]:
-        """get all tasks wrapper"""
-        tasks = []  # type: List[Task]
+    def _task_path(self, team_id: str, params: Dict[str, Any]) -> str:
+        """forms the url-encoded task search path for the given _get_tasks options"""
+        options = []
+        for key, value in params.items():
+            if key in self.task_boolean_options:
+                value = str(value).lower()
+            elif isinstance(value, datetime):
+                value = datetime_to_ts(value)
+            if key in self.task_list_options:
+                joined = ",".join(quote(str(x), safe="") for x in value)
+                options.append(f"{key}[]={joined}")
+            else:
+                options.append(f"{key}={quote(str(value), safe='')}")
+        return f"team/{team_id}/task?{'&'.join(options)}"
+
+    def _iter_all_tasks(
+        self,
+        team_id: str,
+        page_limit: int = -1,
+        shards: int = 0,  # integer, crawl date_created ranges in parallel if > 0
+        processes: int = 0,  # integer, parse pages in a process pool if > 0
+        prefetch: int = 0,  # integer, pages to fetch ahead in parallel if > 0
+        **kwargs: Any,
+    ) -> Iterator[Task]:
+        """yields every task, one page at a time"""
+        if len([x for x in (prefetch, shards, processes) if x]) > 1:
+            raise Exception("pick one of prefetch, shards or processes")
+        if prefetch:
+            yield from self._iter_prefetched_tasks(
+                team_id, prefetch, page_limit=page_limit, **kwargs
+            )
+            return
+        if shards:
+            if page_limit != -1:
+                raise Exception("shards crawl every page, so page_limit can't be set")
+            yield from self._iter_sharded_tasks(team_id, shards, **kwargs)
+            return
+        if processes:
+            yield from self._iter_pipelined_tasks(
+                team_id, processes, page_limit=page_limit, **kwargs
+            )
+            return
         page_count = 0
         task_page = self._get_tasks(team_id, page=page_count, **kwargs)
         while task_page and (page_limit == -1 or page_count < page_limit):
-            tasks += task_page
+            yield from task_page
             page_count += 1
             task_page = self._get_tasks(team_id, page=page_count, **kwargs)
-        return tasks
+
+    def _iter_prefetched_tasks(
+        self, team_id: str, prefetch: int, page_limit: int = -1, **kwargs: Any
+    ) -> Iterator[Task]:
+        """
+        keeps up to prefetch pages in flight, yielding tasks in page order.
+        stops at the first short page, so a few pages past the end may
+        be requested
+        """
+        pending = deque()  # type: deque
+        page_count = 0
+        with ThreadPoolExecutor(max_workers=prefetch) as pool:
+            while True:
+                while len(pending) < prefetch and (
+                    page_limit == -1 or page_count < page_limit
+                ):
+                    pending.append(
+                        pool.submit(self._get_tasks, team_id, page=page_count, **kwargs)
+                    )
+                    page_count += 1
+                if not pending:
+                    return
+                tasks = pending.popleft().result()
+                yield from tasks
+                if len(tasks) < TASK_PAGE_SIZE:
+                    for future in pending:
+                        future.cancel()
+                    return
+
+    def _iter_pipelined_tasks(
+        self, team_id: str, processes: int, page_limit: int = -1, **kwargs: Any
+    ) -> Iterator[Task]:
+        """
+        fetches pages on this thread while a process pool decodes them and
+        builds the models, yielding tasks in page order. the end of the
+        crawl is only known once a short page is parsed, so up to
+        2 * processes pages past the last one may be requested
+        """
+        # multiprocessing is slow to import, so only pull it in when used
+        from concurrent.futures import (  # pylint: disable=import-outside-toplevel
+            ProcessPoolExecutor,
+        )
+
+        window = processes * 2
+        pending = deque()  # type: deque
+        page_count = 0
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            while True:
+                fetching = page_limit == -1 or page_count < page_limit
+                if fetching and len(pending) < window:
+                    response = self._get_tasks(
+                        team_id, page=page_count, raw=True, **kwargs
+                    )
+                    pending.append(pool.submit(parse_task_page, response.content))
+                    page_count += 1
+                    if not pending[0].done():
+                        continue
+                if not pending:
+                    return
+                tasks = pending.popleft().result()
+                for task in tasks:
+                    yield task.attach(self)
+                if len(tasks) < TASK_PAGE_SIZE:
+                    for future in pending:
+                        future.cancel()
+                    return
+
+    def _iter_sharded_tasks(
+        self,
+        team_id: str,
+        shards: int,
+        max_workers: int = None,  # integer, defaults to the client's max_workers
+        date_created_gt: Union[int, datetime] = None,
+        date_created_lt: Union[int, datetime] = None,
+        **kwargs: Any,
+    ) -> Iterator[Task]:
+        """
+        splits the date_created range into shards and crawls them in parallel.
+        a shard whose first page comes back full is split in half again,
+        until it's narrower than MIN_SHARD_MS and the rest of it is paged
+        through instead.
+        shards never overlap, and tasks are deduplicated by id regardless
+        """
+        start = date_created_gt if date_created_gt is not None else CLICKUP_EPOCH
+        end = date_created_lt if date_created_lt is not None else datetime.now()
+        start = start if isinstance(start, int) else datetime_to_ts(start)
+        end = end if isinstance(end, int) else datetime_to_ts(end)
+        shards = max(1, min(shards, (end - start) // MIN_SHARD_MS))
+        width = (end - start) / shards
+        bounds = [round(start + x * width) for x in range(shards)] + [end]
+
+        def first_page(low: int, high: int) -> tuple:
+            page = self._get_tasks(
+                team_id, page=0, date_created_gt=low, date_created_lt=high, **kwargs
+            )
+            return low, high, page, True
+
+        def whole_shard(low: int, high: int, tasks: List[Task]) -> tuple:
+            page_count = 1
+            while len(tasks) == page_count * TASK_PAGE_SIZE:
+                tasks = tasks + self._get_tasks(
+                    team_id,
+                    page=page_count,
+                    date_created_gt=low,
+                    date_created_lt=high,
+                    **kwargs,
+                )
+                page_count += 1
+            return low, high, tasks, False
+
+        # both bounds are exclusive, so each lower bound is pulled back one ms
+        seen = set()
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as pool:
+            pending = {
+                pool.submit(first_page, bounds[x] - (x > 0), bounds[x + 1])
+                for x in range(shards)
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    low, high, tasks, partial = future.result()
+                    if partial and len(tasks) >= TASK_PAGE_SIZE:
+                        if high - low > MIN_SHARD_MS:
+                            middle = (low + high) // 2
+                            pending.add(pool.submit(first_page, low, middle))
+                            pending.add(pool.submit(first_page, middle - 1, high))
+                        else:
+                            pending.add(pool.submit(whole_shard, low, high, tasks))
+                        continue
+                    for task in tasks:
+                        if task.id not in seen:
+                            seen.add(task.id)
+                            yield task
+
+    def _get_all_tasks(
+        self, team_id: str, page_limit: int = -1, **kwargs: Any
+    ) -> List[Task]:
+        """get all tasks wrapper"""
+        return list(self._iter_all_tasks(team_id, page_limit=page_limit, **kwargs))
+
+    def iter_all_tasks(self, team_id: str, **kwargs: Any) -> Iterator[Task]:
+        """
+        streams every task in a team as its page arrives, taking the same
+        filters and parallel options as get_all_tasks
+        """
+        return self._iter_all_tasks(team_id, **kwargs)
+
+    def iter_tasks_everywhere(
+        self,
+        scope: str = "team",  # string, [team, space]
+        max_workers: int = None,  # integer, defaults to the client's max_workers
+        page_limit: int = -1,
+        **kwargs: Any,
+    ) -> Iterator[Task]:
+        """
+        crawls every team (or every space of every team) concurrently,
+        yielding each task once as soon as its page arrives.
+        all crawls share this client's worker count and rate limit
+        """
+        if scope not in ("team", "space"):
+            raise Exception(f"invalid scope '{scope}', expected team or space")
+        workers = max_workers or self.max_workers
+        teams = self.teams
+        if scope == "team":
+            scopes = [(x.id, {}) for x in teams]  # type: list
+        else:
+            load_spaces = [lambda x=x: x.spaces for x in teams]
+            spaces = interleave(load_spaces, workers)
+            scopes = [(x.team.id, {"space_ids": [x.id]}) for x in spaces]
+
+        seen = set()
+        crawls = [
+            lambda x=x, y=y: self._iter_all_tasks(
+                x, page_limit=page_limit, **{**kwargs, **y}
+            )
+            for x, y in scopes
+        ]
+        for task in interleave(crawls, workers):
+            if task.id in seen:
+                continue
+            seen.add(task.id)
+            yield task
+
+    def query_tasks(
+        self,
+        team_id: str,
+        query: TaskQuery,
+        page_limit: int = -1,
+        max_workers: int = None,  # integer, defaults to the client's max_workers
+    ) -> Iterator[Task]:
+        """
+        streams the tasks matching a TaskQuery. server side filters are sent
+        with the request, and the query is split into several concurrent
+        requests when its id lists would make the url too long
+        """
+
+        # measure with the widest page number that will be sent, leaving
+        # room for seven digits when the crawl isn't limited
+        widest = max(page_limit - 1, 0) if page_limit != -1 else 9_999_999
+
+        def fits(part: TaskQuery) -> bool:
+            path = self._task_path(team_id, {**part.params(), "page": widest})
+            return len(urllib.parse.urljoin(self.api_url, path)) <= MAX_URL_LENGTH
+
+        parts = query.split(fits)
+        crawls = [
+            lambda x=x: self._iter_all_tasks(
+                team_id, page_limit=page_limit, **x.params()
+            )
+            for x in parts
+        ]
+        seen = set()
+        for task in interleave(crawls, max_workers or self.max_workers):
+            if len(parts) > 1:
+                if task.id in seen:
+                    continue
+                seen.add(task.id)
+            if query.matches(task):
+                yield task
+
+    def get_all_tasks_everywhere(self, **kwargs: Any) -> List[Task]:
+        """gets every task the token can see, across all teams"""
+        return list(self.iter_tasks_everywhere(**kwargs))
 
     def _create_task(
         self,
@@ -199,6 +706,14 @@ class ClickUp:
         return self.post(f"list/{list_id}/task", data=data)
 
 
+def parse_task_page(content: bytes) -> List[Task]:
+    """decodes a raw task page into client-less tasks, for use in a process pool"""
+    task_list = json.loads(content)
+    if not isinstance(task_list, dict):
+        return []
+    return [Task(x) for x in task_list["tasks"]]
+
+
 def test_client() -> ClickUp:
     """returns a test client"""
     return ClickUp(TEST_TOKEN, api_url=TEST_API_URL, debug=True)
@@ -0,0 +1,179 @@
+"""
+change detection between task snapshots
+"""
+import hashlib
+import json
+import sqlite3
+import struct
+from pyclickup.globals import LIBRARY
+from pyclickup.models import Task
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple  # noqa
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fields (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS hashes (id TEXT PRIMARY KEY, digest INTEGER, fields BLOB);
+"""
+FIELD = struct.Struct(">HI")  # field number, 4 byte hash of its value
+
+
+def _digest(value: Any, size: int) -> int:
+    """a blake2b hash of a json value, as an integer"""
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=size).digest()
+    return int.from_bytes(digest, "big", signed=size == 8)
+
+
+class TaskDiff:
+    """the tasks added, removed and changed (with their changed fields)"""
+
+    def __init__(self) -> None:
+        """constructor"""
+        self.added = []  # type: List[str]
+        self.removed = []  # type: List[str]
+        self.changed = {}  # type: Dict[str, List[str]]
+
+    def __repr__(self):
+        """repr"""
+        return (
+            f"<{LIBRARY}.TaskDiff +{len(self.added)} "
+            f"-{len(self.removed)} ~{len(self.changed)}>"
+        )
+
+    def __bool__(self) -> bool:
+        """is there any change"""
+        return bool(self.added or self.removed or self.changed)
+
+
+class HashIndex:
+    """
+    per-task content hashes of the raw payload, stored in sqlite so large
+    collections can be diffed as they stream in without holding the
+    previous snapshot in memory. each task keeps an 8 byte hash of the
+    whole payload, and a 4 byte hash per field to name what changed
+    """
+
+    def __init__(self, path: str = ":memory:", batch_size: int = 500) -> None:
+        """opens (or creates) the index"""
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self._fields = {}  # type: Dict[str, int]
+        self._names = {}  # type: Dict[int, str]
+        self._load_fields()
+
+    def __repr__(self):
+        """repr"""
+        return f"<{LIBRARY}.HashIndex '{self.path}' [{len(self)} tasks]>"
+
+    def __len__(self) -> int:
+        """number of tasks indexed"""
+        return self.connection.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def close(self) -> None:
+        """closes the index"""
+        self.connection.close()
+
+    def _load_fields(self) -> None:
+        """reads the field numbering"""
+        self._fields = dict(self.connection.execute("SELECT name, id FROM fields"))
+        self._names = {y: x for x, y in self._fields.items()}
+
+    def _field(self, name: str) -> int:
+        """the number of a field name, registering it if it's new"""
+        if name not in self._fields:
+            number = self.connection.execute(
+                "INSERT INTO fields (name) VALUES (?)", (name,)
+            ).lastrowid
+            assert number is not None  # always set by an insert
+            self._fields[name] = number
+            self._names[number] = name
+        return self._fields[name]
+
+    def hash_task(self, task: Task) -> Tuple[int, bytes]:
+        """the payload hash and packed field hashes of a task"""
+        payload = task._payload
+        fields = b"".join(
+            FIELD.pack(self._field(x), _digest(payload[x], 4)) for x in sorted(payload)
+        )
+        return _digest(payload, 8), fields
+
+    def _unpack(self, fields: bytes) -> Dict[str, int]:
+        """packed field hashes back to a name -> hash dict"""
+        return {
+            self._names[x]: y
+            for x, y in (
+                FIELD.unpack_from(fields, z) for z in range(0, len(fields), FIELD.size)
+            )
+        }
+
+    def _diff_batch(self, tasks: List[Task], result: TaskDiff, update: bool) -> None:
+        """compares one batch of tasks against the stored hashes"""
+        ids = [str(x.id) for x in tasks]
+        marks = ", ".join("?" * len(ids))
+        stored = {
+            x: (y, z)
+            for x, y, z in self.connection.execute(
+                f"SELECT id, digest, fields FROM hashes WHERE id IN ({marks})",  # nosec
+                ids,
+            )
+        }
+        rows = []
+        for task_id, task in zip(ids, tasks):
+            digest, fields = self.hash_task(task)
+            if task_id not in stored:
+                result.added.append(task_id)
+            elif stored[task_id][0] != digest:
+                old, new = self._unpack(stored[task_id][1]), self._unpack(fields)
+                result.changed[task_id] = sorted(
+                    x for x in set(old) | set(new) if old.get(x) != new.get(x)
+                )
+            else:
+                continue
+            rows.append((task_id, digest, fields))
+        if update and rows:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?)", rows
+            )
+
+    def diff(self, tasks: Iterable[Task], update: bool = True) -> TaskDiff:
+        """
+        diffs a complete task collection against the index. any indexed
+        task that isn't in the collection counts as removed. with update,
+        the index is left matching the collection
+        """
+        result = TaskDiff()
+        try:
+            self._diff(tasks, result, update)
+        except Exception:
+            # new field numbers were rolled back along with everything else
+            self._load_fields()
+            raise
+        return result
+
+    def _diff(self, tasks: Iterable[Task], result: TaskDiff, update: bool) -> None:
+        """streams the collection through the index in one transaction"""
+        seen = set()  # type: Set[str]
+        batch = []  # type: List[Task]
+        with self.connection:
+            for task in tasks:
+                task_id = str(task.id)
+                if task_id in seen:
+                    continue
+                seen.add(task_id)
+                batch.append(task)
+                if len(batch) >= self.batch_size:
+                    self._diff_batch(batch, result, update)
+                    batch = []
+            if batch:
+                self._diff_batch(batch, result, update)
+            result.removed = [
+                x
+                for (x,) in self.connection.execute("SELECT id FROM hashes")
+                if x not in seen
+            ]
+            if update and result.removed:
+                self.connection.executemany(
+                    "DELETE FROM hashes WHERE id = ?", [(x,) for x in result.removed]
+                )
@@ -0,0 +1,157 @@
+"""
+in-memory search indexes over fetched tasks
+"""
+import re
+import threading
+from pyclickup.globals import LIBRARY
+from pyclickup.models import Task
+from pyclickup.utils.text import ref_id, task_priority
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple  # noqa
+
+
+TOKEN = re.compile(r"\w+")
+FIELDS = ["text", "tag", "status", "priority", "assignee", "list"]
+
+
+def tokens(text: Optional[str]) -> Set[str]:
+    """the lowercased words of some text"""
+    return set(TOKEN.findall(text.lower())) if text else set()
+
+
+class TaskIndex:
+    """
+    an inverted index over task names, content and tags, with secondary
+    indexes on status, priority, assignee and list. lookups intersect the
+    postings from the smallest set up, so they cost the size of the matches
+    rather than the collection. with a client, tasks are reindexed whenever
+    Task.update succeeds
+    """
+
+    def __init__(self, tasks: Iterable[Task] = (), client: Any = None) -> None:
+        """constructor"""
+        self._tasks = {}  # type: Dict[str, Task]
+        self._order = {}  # type: Dict[str, int]
+        self._keys = {}  # type: Dict[str, List[Tuple[str, Any]]]
+        self._postings = {x: {} for x in FIELDS}  # type: Dict[str, Dict[Any, Set[str]]]
+        self._count = 0
+        self._lock = threading.Lock()
+        self.client = client
+        if client:
+            client.subscribe(self.add)
+        self.extend(tasks)
+
+    def __repr__(self):
+        """repr"""
+        return f"<{LIBRARY}.TaskIndex [{len(self)} tasks]>"
+
+    def __len__(self) -> int:
+        """number of tasks indexed"""
+        return len(self._tasks)
+
+    def __contains__(self, task_id: str) -> bool:
+        """is a task indexed"""
+        return task_id in self._tasks
+
+    def close(self) -> None:
+        """stops following task updates"""
+        if self.client:
+            self.client.unsubscribe(self.add)
+
+    def get(self, task_id: str) -> Optional[Task]:
+        """an indexed task by id"""
+        return self._tasks.get(task_id)
+
+    @staticmethod
+    def _index_keys(task: Task) -> List[Tuple[str, Any]]:
+        """every (index, key) a task is filed under"""
+        tags = [x.name.lower() for x in task.tags if x.name]
+        words = tokens(getattr(task, "name", None))
+        words |= tokens(getattr(task, "content", None))
+        for tag in tags:
+            words |= tokens(tag)
+        keys = [("text", x) for x in words] + [("tag", x) for x in set(tags)]
+        status = getattr(task.status, "status", None)
+        if status:
+            keys.append(("status", status.lower()))
+        priority = task_priority(getattr(task, "priority", None))
+        if priority is not None:
+            keys.append(("priority", priority))
+        keys += [("assignee", x.id) for x in task.assignees]
+        list_id = ref_id(getattr(task, "list", None))
+        if list_id is not None:
+            keys.append(("list", list_id))
+        return keys
+
+    def _unfile(self, task_id: str) -> None:
+        """drops a task from every posting it's in"""
+        for field, key in self._keys.pop(task_id, []):
+            postings = self._postings[field]
+            postings[key].discard(task_id)
+            if not postings[key]:
+                del postings[key]
+
+    def add(self, task: Task) -> None:
+        """indexes a task, replacing any earlier version of it"""
+        keys = self._index_keys(task)
+        task_id = str(task.id)
+        with self._lock:
+            self._unfile(task_id)
+            if task_id not in self._order:
+                self._order[task_id] = self._count
+                self._count += 1
+            self._tasks[task_id] = task
+            self._keys[task_id] = keys
+            for field, key in keys:
+                self._postings[field].setdefault(key, set()).add(task_id)
+
+    def extend(self, tasks: Iterable[Task]) -> int:
+        """indexes tasks as they stream in, returning how many were added"""
+        count = 0
+        for task in tasks:
+            self.add(task)
+            count += 1
+        return count
+
+    def remove(self, task_id: str) -> None:
+        """drops a task from the index"""
+        with self._lock:
+            self._unfile(task_id)
+            self._tasks.pop(task_id, None)
+            self._order.pop(task_id, None)
+
+    def search(
+        self,
+        text: str = None,  # string, every word must appear in the name, content or tags
+        status: str = None,  # string, case insensitive
+        priority: int = None,  # integer, see Task.Priority
+        assignee: int = None,  # integer, user id
+        list_id: str = None,  # string
+        tag: str = None,  # string, case insensitive
+    ) -> List[Task]:
+        """the tasks matching every given condition, in the order they were added"""
+        wanted = [("text", x) for x in tokens(text)]  # type: List[Tuple[str, Any]]
+        if text is not None and not wanted:
+            return []  # no words to match
+        if tag is not None:
+            wanted.append(("tag", tag.lower()))
+        if status is not None:
+            wanted.append(("status", status.lower()))
+        if priority is not None:
+            wanted.append(("priority", priority))
+        if assignee is not None:
+            wanted.append(("assignee", assignee))
+        if list_id is not None:
+            wanted.append(("list", list_id))
+        with self._lock:
+            if not wanted:
+                return list(self._tasks.values())
+            postings = sorted(
+                (self._postings[x].get(y, set()) for x, y in wanted), key=len
+            )
+            matches = set(postings[0])
+            for posting in postings[1:]:
+                if not matches:
+                    break
+                matches &= posting
+            ordered = sorted(matches, key=lambda x: self._order[x])
+            return [self._tasks[x] for x in ordered]
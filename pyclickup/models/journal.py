@@ -0,0 +1,289 @@
+"""
+a durable write-behind journal for post and put requests
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pyclickup.globals import LIBRARY, RATE_LIMIT_BACKOFF
+from typing import Any, Callable, Dict, List, Optional, Tuple  # noqa
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, method TEXT, path TEXT, kwargs TEXT,
+    state TEXT, attempts INTEGER DEFAULT 0, created REAL, not_before REAL,
+    finished REAL, status INTEGER, response TEXT, error TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_state ON entries (state, id);
+CREATE INDEX IF NOT EXISTS entries_path ON entries (state, path, id);
+"""
+CLAIM = """
+WITH RECURSIVE paths (path) AS (
+    SELECT MIN(path) FROM entries WHERE state = :pending
+    UNION ALL
+    SELECT (
+        SELECT MIN(path) FROM entries WHERE state = :pending AND path > paths.path
+    ) FROM paths WHERE paths.path IS NOT NULL
+)
+SELECT id, method, path, kwargs, created FROM entries WHERE id IN (
+    SELECT (
+        SELECT MIN(id) FROM entries WHERE state = :pending AND path = paths.path
+    ) FROM paths WHERE paths.path IS NOT NULL AND paths.path NOT IN ({})
+) AND not_before <= :now ORDER BY id LIMIT :room
+"""
+PENDING = "pending"
+SENDING = "sending"
+DONE = "done"
+FAILED = "failed"
+
+
+def _loads(text: Optional[str]) -> Any:
+    """a stored response body, decoded if it's json"""
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+class Journal:
+    """
+    appends post and put requests to a sqlite (WAL) journal and returns
+    at once, while a background flusher sends them on up to max_workers
+    threads. requests to the same path go out one at a time, in the order
+    they were journaled. each entry is committed as done along with its
+    response, so after a crash only the entries that never finished are
+    sent again: puts replay safely, but a post that was in flight when the
+    process died may be applied twice, since the v1 api has no idempotency
+    keys
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        path: str,
+        max_workers: int = 4,
+        retries: int = 3,
+        poll: float = 0.5,  # seconds between checks for retries that are due
+        start: bool = True,
+    ) -> None:
+        """opens the journal, requeueing anything left in flight by a crash"""
+        self.client = client
+        self.path = path
+        self.max_workers = max_workers
+        self.retries = retries
+        self.poll = poll
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        with self.connection:
+            self.connection.execute(
+                "UPDATE entries SET state = ? WHERE state = ?", (PENDING, SENDING)
+            )
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._paths = set()  # type: set
+        self._latencies = deque(maxlen=1000)  # type: deque
+        self._counts = {"sent": 0, "failed": 0, "retried": 0}
+        self._callbacks = {}  # type: Dict[int, Callable[[Dict[str, Any]], Any]]
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._thread = None  # type: Optional[threading.Thread]
+        if start:
+            self.start()
+
+    def __repr__(self):
+        """repr"""
+        return f"<{LIBRARY}.Journal '{self.path}' [{self.depth} queued]>"
+
+    def _query(self, sql: str, *args: Any) -> List[tuple]:
+        """runs a statement under the lock, committing it"""
+        with self._lock, self.connection:
+            return self.connection.execute(sql, args).fetchall()
+
+    def append(
+        self,
+        method: str,
+        path: str,
+        kwargs: Dict[str, Any],
+        callback: Callable[[Dict[str, Any]], Any] = None,
+    ) -> int:
+        """
+        journals a request, returning its entry id. callback is called with
+        the entry once it's done or has failed, if that happens before this
+        process exits
+        """
+        now = time.time()
+        with self._wake, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO entries "
+                "(method, path, kwargs, state, created, not_before) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (method, path, json.dumps(kwargs), PENDING, now, now),
+            )
+            entry_id = cursor.lastrowid
+            assert entry_id is not None  # always set by an insert
+            if callback is not None:
+                self._callbacks[entry_id] = callback
+            self._wake.notify()
+        return entry_id
+
+    def entry(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """an entry's state, attempts and, once sent, its response"""
+        rows = self._query(
+            "SELECT method, path, state, attempts, status, response, error "
+            "FROM entries WHERE id = ?",
+            entry_id,
+        )
+        if not rows:
+            return None
+        method, path, state, attempts, status, response, error = rows[0]
+        return {
+            "id": entry_id,
+            "method": method,
+            "path": path,
+            "state": state,
+            "attempts": attempts,
+            "status": status,
+            "response": _loads(response),
+            "error": error,
+        }
+
+    @property
+    def depth(self) -> int:
+        """how many entries are waiting or in flight"""
+        return self._query(
+            "SELECT COUNT(*) FROM entries WHERE state IN (?, ?)", PENDING, SENDING
+        )[0][0]
+
+    def metrics(self) -> Dict[str, Any]:
+        """queue depth, outcome counts and journal-to-done latency in seconds"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = {**self._counts, "in_flight": len(self._paths)}  # type: dict
+        metrics["depth"] = self.depth
+        metrics["flush_latency_p50"] = (
+            latencies[len(latencies) // 2] if latencies else None
+        )
+        metrics["flush_latency_p95"] = (
+            latencies[int(len(latencies) * 0.95)] if latencies else None
+        )
+        return metrics
+
+    def _claim(self) -> List[Tuple[int, str, str, str, float]]:
+        """
+        marks due entries as sending, at most one per path and max_workers
+        in all. called with the lock held
+        """
+        room = self.max_workers - len(self._paths)
+        if room <= 0:
+            return []
+        busy = {f"busy{x}": y for x, y in enumerate(self._paths)}
+        # only the oldest pending entry of each path can go, due or not. the
+        # paths are skipped through on the (state, path, id) index, so this
+        # costs the number of paths rather than the number of entries
+        with self.connection:
+            due = self.connection.execute(
+                CLAIM.format(", ".join(f":{x}" for x in busy)),
+                {"pending": PENDING, "now": time.time(), "room": room, **busy},
+            ).fetchall()
+            self.connection.executemany(
+                "UPDATE entries SET state = ? WHERE id = ?",
+                [(SENDING, x[0]) for x in due],
+            )
+        self._paths |= {x[2] for x in due}
+        return due
+
+    def _send(self, entry: Tuple[int, str, str, str, float]) -> None:
+        """sends one entry and records the outcome"""
+        entry_id, method, path, kwargs, created = entry
+        status, response, error = None, None, None
+        callback = None
+        try:
+            request = self.client._req(path, method=method, **json.loads(kwargs))
+            status, response = request.status_code, request.text
+        except Exception as exception:  # pylint: disable=broad-except
+            error = f"{type(exception).__name__}: {exception}"
+        with self._wake, self.connection:
+            self.connection.execute(
+                "UPDATE entries SET attempts = attempts + 1 WHERE id = ?", (entry_id,)
+            )
+            attempts = self.connection.execute(
+                "SELECT attempts FROM entries WHERE id = ?", (entry_id,)
+            ).fetchone()[0]
+            now = time.time()
+            retry = status is None or status == 429 or status >= 500
+            if retry and attempts <= self.retries:
+                self._counts["retried"] += 1
+                self.connection.execute(
+                    "UPDATE entries SET state = ?, not_before = ?, status = ?, "
+                    "error = ? WHERE id = ?",
+                    (
+                        PENDING,
+                        now + RATE_LIMIT_BACKOFF * attempts,
+                        status,
+                        error,
+                        entry_id,
+                    ),
+                )
+            else:
+                state = DONE if status is not None and status < 400 else FAILED
+                self._counts["sent" if state == DONE else "failed"] += 1
+                self._latencies.append(now - created)
+                self.connection.execute(
+                    "UPDATE entries SET state = ?, finished = ?, status = ?, "
+                    "response = ?, error = ? WHERE id = ?",
+                    (state, now, status, response, error, entry_id),
+                )
+                callback = self._callbacks.pop(entry_id, None)
+            self._paths.discard(path)
+            self._wake.notify_all()
+        if callback is not None:
+            callback(self.entry(entry_id) or {})
+
+    def _run(self) -> None:
+        """the flusher loop"""
+        while not self._stop.is_set():
+            with self._wake:
+                due = self._claim()
+                if not due:
+                    self._wake.wait(self.poll)
+                    continue
+            for entry in due:
+                self._pool.submit(self._send, entry)
+
+    def start(self) -> "Journal":
+        """starts the background flusher"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def flush(self, timeout: float = None) -> bool:
+        """waits until every entry is done or failed, returning whether it was"""
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.depth:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            with self._wake:
+                self._wake.wait(self.poll)
+        return True
+
+    def close(self, flush: bool = True) -> None:
+        """stops the flusher, by default after sending everything queued"""
+        if flush and self._thread is not None:
+            self.flush()
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._pool.shutdown(wait=True)
+        self.connection.close()
@@ -0,0 +1,155 @@
+"""
+a client spreading requests over several tokens
+"""
+import threading
+from pyclickup.models.client import ClickUp
+from pyclickup.models.error import RateLimited
+from typing import Any, Dict, Iterator, List, Union, TYPE_CHECKING  # noqa
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests.models import Response  # noqa
+    from pyclickup.models import Task  # noqa
+
+
+class ClickUpPool(ClickUp):
+    """
+    a ClickUp client backed by several tokens (or clients) with access to
+    the same workspaces. since rate limits are per token, every request
+    goes to the member with the most rate limit left, as reported by its
+    last X-RateLimit-Remaining header, less the requests it has in flight.
+    a request rate limited on one member is tried on the others.
+    everything built on requests (hierarchy loading, sharded task crawls,
+    queries) is shared out this way, and the pool's workers are the sum
+    of its members'
+    """
+
+    def __init__(self, members: List[Union[str, ClickUp]], **kwargs: Any) -> None:
+        """
+        takes tokens or clients. tokens are made into clients with kwargs,
+        which are ClickUp's options. cache, journal, rate_limit and adaptive
+        also apply to the pool as a whole: its hierarchy cache, one journal
+        flushed through the pool, a rate limit of rate_limit per token, and
+        an adaptive limit on the requests in flight across every member
+        """
+        if not members:
+            raise Exception("a pool needs at least one token or client")
+        member_kwargs = {x: y for x, y in kwargs.items() if x != "journal"}
+        self.clients = [
+            x if isinstance(x, ClickUp) else ClickUp(x, **member_kwargs)
+            for x in members
+        ]
+        first = self.clients[0]
+        rate_limit = kwargs.get("rate_limit")
+        super().__init__(
+            first.token,
+            api_url=first.api_url,
+            cache=kwargs.get("cache", True),
+            debug=first.debug,
+            max_workers=sum(x.max_workers for x in self.clients),
+            rate_limit=rate_limit * len(self.clients) if rate_limit else None,
+            adaptive=kwargs.get("adaptive", False),
+            journal=kwargs.get("journal"),
+        )
+        self._usage = [
+            {"requests": 0, "in_flight": 0, "rate_limited": 0, "errors": 0}
+            for _ in self.clients
+        ]  # type: List[Dict[str, int]]
+        self._usage_lock = threading.Lock()
+
+    def __repr__(self):
+        """repr"""
+        return f"<{type(self).__name__} [{len(self.clients)} tokens]>"
+
+    def _pick(self, exclude: set) -> int:
+        """the member with the most rate limit left, net of requests in flight"""
+
+        def budget(index: int) -> tuple:
+            remaining = self.clients[index].rate_remaining
+            usage = self._usage[index]
+            left = float("inf") if remaining is None else remaining
+            return (left - usage["in_flight"], -usage["requests"])
+
+        with self._usage_lock:
+            index = max(
+                (x for x in range(len(self.clients)) if x not in exclude), key=budget
+            )
+            self._usage[index]["in_flight"] += 1
+            self._usage[index]["requests"] += 1
+        return index
+
+    def _req(self, path: str, method: str = "get", **kwargs: Any) -> "Response":
+        """sends the request through the best member, moving on if it's limited"""
+        tried = set()  # type: set
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            started = self.limiter.acquire() if self.limiter else 0.0
+            index = self._pick(tried)
+            outcome = "errors"
+            try:
+                response = self.clients[index]._req(path, method=method, **kwargs)
+                outcome = "rate_limited" if response.status_code == 429 else ""
+            except RateLimited:
+                outcome = "rate_limited"
+            finally:
+                with self._usage_lock:
+                    self._usage[index]["in_flight"] -= 1
+                    if outcome:
+                        self._usage[index][outcome] += 1
+                if self.limiter:
+                    self.limiter.release(
+                        started, rate_limited=outcome == "rate_limited"
+                    )
+            if not outcome:
+                return response
+            # no header on a bare 429, so mark the budget spent ourselves
+            self.clients[index].rate_remaining = 0
+            tried.add(index)
+            if len(tried) == len(self.clients):
+                raise RateLimited()
+
+    def _iter_all_tasks(
+        self,
+        team_id: str,
+        page_limit: int = -1,
+        shards: int = 0,
+        processes: int = 0,
+        prefetch: int = 0,
+        **kwargs: Any,
+    ) -> Iterator["Task"]:
+        """
+        yields every task. unless another parallel mode, a page limit or an
+        order is asked for, the crawl is sharded by date_created, a few
+        shards per token. shards arrive in no particular order, so ordered
+        crawls are paged through instead
+        """
+        ordered = kwargs.get("order_by") or kwargs.get("reverse")
+        if not (shards or processes or prefetch or ordered) and page_limit == -1:
+            shards = 4 * len(self.clients)
+        yield from super()._iter_all_tasks(
+            team_id,
+            page_limit=page_limit,
+            shards=shards,
+            processes=processes,
+            prefetch=prefetch,
+            **kwargs,
+        )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """per token usage: requests, in flight, rate limited, errors and budget left"""
+        with self._usage_lock:
+            return [
+                {
+                    "token": f"...{x.token[-4:]}",
+                    "rate_remaining": x.rate_remaining,
+                    **y,
+                }
+                for x, y in zip(self.clients, self._usage)
+            ]
+
+    def close(self) -> None:
+        """closes every member"""
+        super().close()
+        for client in self.clients:
+            client.close()
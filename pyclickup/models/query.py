@@ -0,0 +1,145 @@
+"""
+composable task query builder
+"""
+from datetime import datetime
+from pyclickup.globals import LIBRARY
+from pyclickup.models import Task, User
+from pyclickup.utils.text import datetime_to_ts
+from typing import Any, Callable, Dict, List, Union  # noqa
+
+
+Timestamp = Union[int, datetime]
+SPLITTABLE = ["list_ids", "project_ids", "space_ids", "assignees", "statuses"]
+
+
+def _ts(value: Timestamp) -> int:
+    """normalizes a posix x1000 timestamp or datetime"""
+    return value if isinstance(value, int) else datetime_to_ts(value)
+
+
+class TaskQuery:
+    """
+    builds a task search. everything the api can filter on is sent with the
+    request, anything else is checked against each task as it streams in.
+
+    query = (
+        TaskQuery()
+        .lists("123", "456")
+        .statuses("Open", "in progress")
+        .created(after=datetime(2019, 1, 1))
+        .where(lambda task: "urgent" in task.name)
+    )
+    tasks = team.query_tasks(query)
+    """
+
+    def __init__(self) -> None:
+        """constructor"""
+        self._params = {}  # type: Dict[str, Any]
+        self._predicates = []  # type: List[Callable[[Task], bool]]
+
+    def __repr__(self):
+        """repr"""
+        return f"<{LIBRARY}.TaskQuery {self._params}>"
+
+    def _copy(self, **params: Any) -> "TaskQuery":
+        """returns a new query with the given server params merged in"""
+        query = TaskQuery()
+        query._params = {**self._params, **params}
+        query._predicates = list(self._predicates)
+        return query
+
+    def _extend(self, key: str, values: tuple) -> "TaskQuery":
+        """adds ids to a server side list filter"""
+        return self._copy(**{key: self._params.get(key, []) + list(values)})
+
+    def spaces(self, *space_ids: str) -> "TaskQuery":
+        """only tasks in these spaces"""
+        return self._extend("space_ids", space_ids)
+
+    def projects(self, *project_ids: str) -> "TaskQuery":
+        """only tasks in these projects"""
+        return self._extend("project_ids", project_ids)
+
+    def lists(self, *list_ids: str) -> "TaskQuery":
+        """only tasks in these lists"""
+        return self._extend("list_ids", list_ids)
+
+    def statuses(self, *statuses: str) -> "TaskQuery":
+        """only tasks with one of these statuses"""
+        return self._extend("statuses", statuses)
+
+    def assignees(self, *assignees: Union[int, User]) -> "TaskQuery":
+        """only tasks assigned to one of these users"""
+        return self._extend(
+            "assignees", tuple(x if isinstance(x, int) else x.id for x in assignees)
+        )
+
+    def ids(self, *task_ids: str) -> "TaskQuery":
+        """only these tasks. the api can't filter on this, so it's client side"""
+        wanted = set(task_ids)
+        return self.where(lambda task: task.id in wanted)
+
+    def _between(
+        self, field: str, after: Timestamp = None, before: Timestamp = None
+    ) -> "TaskQuery":
+        """adds a server side date range"""
+        params = {}
+        if after is not None:
+            params[f"{field}_gt"] = _ts(after)
+        if before is not None:
+            params[f"{field}_lt"] = _ts(before)
+        return self._copy(**params)
+
+    def created(self, after: Timestamp = None, before: Timestamp = None) -> "TaskQuery":
+        """only tasks created within the range"""
+        return self._between("date_created", after, before)
+
+    def updated(self, after: Timestamp = None, before: Timestamp = None) -> "TaskQuery":
+        """only tasks updated within the range"""
+        return self._between("date_updated", after, before)
+
+    def due(self, after: Timestamp = None, before: Timestamp = None) -> "TaskQuery":
+        """only tasks due within the range"""
+        return self._between("due_date", after, before)
+
+    def include_closed(self, include: bool = True) -> "TaskQuery":
+        """include closed tasks"""
+        return self._copy(include_closed=include)
+
+    def subtasks(self, include: bool = True) -> "TaskQuery":
+        """include subtasks"""
+        return self._copy(subtasks=include)
+
+    def order_by(self, field: str, reverse: bool = False) -> "TaskQuery":
+        """orders by one of [id, created, updated, due_date]"""
+        return self._copy(order_by=field, reverse=reverse)
+
+    def where(self, predicate: Callable[[Task], bool]) -> "TaskQuery":
+        """adds a client side filter, applied to every task as it arrives"""
+        query = self._copy()
+        query._predicates.append(predicate)
+        return query
+
+    def params(self) -> Dict[str, Any]:
+        """the keyword arguments to hand to ClickUp._get_tasks"""
+        return dict(self._params)
+
+    def matches(self, task: Task) -> bool:
+        """checks the client side filters against a task"""
+        return all(x(task) for x in self._predicates)
+
+    def split(self, fits: Callable[["TaskQuery"], bool]) -> List["TaskQuery"]:
+        """
+        splits the query into several whose combined results are the same,
+        halving the longest id list until every part fits
+        """
+        if fits(self):
+            return [self]
+        key = max(SPLITTABLE, key=lambda x: len(self._params.get(x, [])))
+        values = self._params.get(key, [])
+        if len(values) < 2:
+            raise Exception("task query is too long to send, even after splitting")
+        half = len(values) // 2
+        return self._copy(**{key: values[:half]}).split(fits) + self._copy(
+            **{key: values[half:]}
+        ).split(fits)
@@ -0,0 +1,319 @@
+"""
+workspace snapshots in an indexed sqlite database
+"""
+import json
+import sqlite3
+import time
+from pyclickup.globals import LIBRARY
+from pyclickup.models import BaseModel, Task
+from pyclickup.utils.concurrency import interleave
+from pyclickup.utils.text import flat_task, int_or_none, snake_keys
+from typing import Any, Dict, Iterable, Iterator, List, Optional  # noqa
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS teams (id TEXT PRIMARY KEY, name TEXT, raw TEXT);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY, username TEXT, email TEXT, raw TEXT
+);
+CREATE TABLE IF NOT EXISTS team_members (
+    team_id TEXT, user_id INTEGER, PRIMARY KEY (team_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS spaces (
+    id TEXT PRIMARY KEY, team_id TEXT, name TEXT, private INTEGER, raw TEXT
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY, space_id TEXT, name TEXT, raw TEXT
+);
+CREATE TABLE IF NOT EXISTS lists (
+    id TEXT PRIMARY KEY, project_id TEXT, name TEXT, raw TEXT
+);
+CREATE TABLE IF NOT EXISTS statuses (
+    scope TEXT, scope_id TEXT, status TEXT, type TEXT, orderindex INTEGER,
+    color TEXT, PRIMARY KEY (scope, scope_id, status)
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY, team_id TEXT, space_id TEXT, project_id TEXT,
+    list_id TEXT, parent TEXT, name TEXT, content TEXT, status TEXT,
+    status_type TEXT, priority INTEGER, creator_id INTEGER,
+    date_created INTEGER, date_updated INTEGER, date_closed INTEGER,
+    due_date INTEGER, start_date INTEGER, raw TEXT
+);
+CREATE TABLE IF NOT EXISTS task_assignees (
+    task_id TEXT, user_id INTEGER, PRIMARY KEY (task_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS task_tags (
+    task_id TEXT, name TEXT, PRIMARY KEY (task_id, name)
+);
+CREATE INDEX IF NOT EXISTS spaces_team ON spaces (team_id);
+CREATE INDEX IF NOT EXISTS projects_space ON projects (space_id);
+CREATE INDEX IF NOT EXISTS lists_project ON lists (project_id);
+CREATE INDEX IF NOT EXISTS tasks_team ON tasks (team_id);
+CREATE INDEX IF NOT EXISTS tasks_list ON tasks (list_id);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS tasks_date_created ON tasks (date_created);
+CREATE INDEX IF NOT EXISTS tasks_date_updated ON tasks (date_updated);
+CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+CREATE INDEX IF NOT EXISTS task_assignees_user ON task_assignees (user_id);
+CREATE INDEX IF NOT EXISTS task_tags_name ON task_tags (name);
+"""
+# the tasks table columns taken from flat_task, between team_id and raw
+TASK_COLUMNS = [
+    "space_id",
+    "project_id",
+    "list_id",
+    "parent",
+    "name",
+    "content",
+    "status",
+    "status_type",
+    "priority",
+    "creator_id",
+    "date_created",
+    "date_updated",
+    "date_closed",
+    "due_date",
+    "start_date",
+]
+
+
+def _raw(model: BaseModel) -> Dict[str, Any]:
+    """the raw payload with snake_case keys"""
+    return snake_keys(model._payload)
+
+
+def _user_row(user: BaseModel) -> tuple:
+    """a users table row"""
+    email = getattr(user, "email", None)
+    username = getattr(user, "username", None)
+    return (user.id, username, email, json.dumps(_raw(user)))
+
+
+def _status_row(scope: str, scope_id: str, status: BaseModel) -> tuple:
+    """a statuses table row"""
+    raw = _raw(status)
+    return (
+        scope,
+        scope_id,
+        raw.get("status"),
+        raw.get("type"),
+        int_or_none(raw.get("orderindex")),
+        raw.get("color"),
+    )
+
+
+class Snapshot:
+    """
+    streams the whole workspace (teams, users, spaces, projects, lists,
+    statuses and tasks) into a normalized sqlite file, in batched
+    transactions. refresh() only fetches tasks updated since the last run
+    """
+
+    def __init__(self, path: str, client: Any = None, batch_size: int = 1000):
+        """opens (or creates) the snapshot database"""
+        self.path = path
+        self.client = client
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __repr__(self):
+        """repr"""
+        return f"<{LIBRARY}.Snapshot '{self.path}'>"
+
+    def close(self) -> None:
+        """closes the database"""
+        self.connection.close()
+
+    def query(self, sql: str, *args: Any) -> List[tuple]:
+        """runs a read query against the snapshot"""
+        return self.connection.execute(sql, args).fetchall()
+
+    def _meta(self, key: str) -> Optional[str]:
+        """reads a meta value"""
+        row = self.query("SELECT value FROM meta WHERE key = ?", key)
+        return row[0][0] if row else None
+
+    def _write(self, sql: str, rows: Iterable[tuple]) -> None:
+        """bulk writes rows, the caller owns the transaction"""
+        self.connection.executemany(sql, rows)
+
+    def _write_hierarchy(self, teams: List[Any]) -> None:
+        """replaces the teams, users, spaces, projects, lists and statuses"""
+        users, members, spaces, projects, lists, statuses = [], [], [], [], [], []
+        for team in teams:
+            users += [_user_row(x) for x in team.members]
+            members += [(team.id, x.id) for x in team.members]
+            for space in team._spaces or []:
+                private = int(bool(space.private))
+                raw = json.dumps(_raw(space))
+                spaces.append((space.id, team.id, space.name, private, raw))
+                statuses += [_status_row("space", space.id, x) for x in space.statuses]
+                for project in space._projects or []:
+                    projects.append(
+                        (project.id, space.id, project.name, json.dumps(_raw(project)))
+                    )
+                    statuses += [
+                        _status_row("project", project.id, x) for x in project.statuses
+                    ]
+                    lists += [
+                        (x.id, project.id, x.name, json.dumps(_raw(x)))
+                        for x in project.lists
+                    ]
+        with self.connection:
+            for table in (
+                "teams",
+                "team_members",
+                "spaces",
+                "projects",
+                "lists",
+                "statuses",
+            ):
+                self.connection.execute(f"DELETE FROM {table}")  # nosec
+            self._write(
+                "INSERT OR REPLACE INTO teams VALUES (?, ?, ?)",
+                [(x.id, x.name, json.dumps(_raw(x))) for x in teams],
+            )
+            self._write("INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?)", users)
+            self._write("INSERT OR REPLACE INTO team_members VALUES (?, ?)", members)
+            self._write("INSERT OR REPLACE INTO spaces VALUES (?, ?, ?, ?, ?)", spaces)
+            self._write("INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?)", projects)
+            self._write("INSERT OR REPLACE INTO lists VALUES (?, ?, ?, ?)", lists)
+            self._write(
+                "INSERT OR REPLACE INTO statuses VALUES (?, ?, ?, ?, ?, ?)", statuses
+            )
+
+    def _prune(self) -> None:
+        """drops the tasks of teams that are gone and users nothing refers to"""
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM tasks WHERE team_id NOT IN (SELECT id FROM teams)"
+            )
+            for table in ("task_assignees", "task_tags"):
+                self.connection.execute(
+                    f"DELETE FROM {table} "  # nosec
+                    "WHERE task_id NOT IN (SELECT id FROM tasks)"
+                )
+            self.connection.execute(
+                "DELETE FROM users WHERE id NOT IN (SELECT user_id FROM team_members) "
+                "AND id NOT IN (SELECT user_id FROM task_assignees)"
+            )
+
+    def write_tasks(self, tasks: Iterable[Task], team_id: str = None) -> int:
+        """upserts tasks in batched transactions, returning how many were written"""
+        written = 0
+        batch = []  # type: List[Task]
+        for task in tasks:
+            batch.append(task)
+            if len(batch) >= self.batch_size:
+                written += self._write_task_batch(batch, team_id)
+                batch = []
+        if batch:
+            written += self._write_task_batch(batch, team_id)
+        return written
+
+    def _write_task_batch(self, tasks: List[Task], team_id: str = None) -> int:
+        """writes one batch of tasks and their assignees and tags"""
+        rows, assignees, tags, users = [], [], [], []
+        for task in tasks:
+            fields = flat_task(task._payload)
+            rows.append(
+                (task.id, team_id or fields["team_id"])
+                + tuple(fields[x] for x in TASK_COLUMNS)
+                + (json.dumps(task._payload),)
+            )
+            for user in task.assignees:
+                assignees.append((task.id, user.id))
+                users.append(_user_row(user))
+            tags += [(task.id, x.name) for x in task.tags]
+        ids = [(x.id,) for x in tasks]
+        with self.connection:
+            self._write("DELETE FROM task_assignees WHERE task_id = ?", ids)
+            self._write("DELETE FROM task_tags WHERE task_id = ?", ids)
+            self._write(
+                f"INSERT OR REPLACE INTO tasks VALUES ({', '.join('?' * 18)})", rows
+            )
+            self._write("INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)", users)
+            self._write("INSERT OR IGNORE INTO task_assignees VALUES (?, ?)", assignees)
+            self._write("INSERT OR IGNORE INTO task_tags VALUES (?, ?)", tags)
+        return len(rows)
+
+    def _crawls(self, teams: List[Any], since: Dict[str, Optional[int]], **kwargs):
+        """one task crawl per team, from each team's last seen update"""
+        for team in teams:
+            filters = dict(kwargs)
+            if since.get(team.id) is not None:
+                filters["date_updated_gt"] = since[team.id]
+
+            def crawl(team_id: str = team.id, filters: dict = filters) -> Iterator:
+                assert self.client is not None  # checked by _sync
+                for task in self.client._iter_all_tasks(team_id, **filters):
+                    yield team_id, task
+
+            yield crawl
+
+    def _sync(self, incremental: bool, **kwargs: Any) -> int:
+        """loads the hierarchy and streams tasks into the snapshot"""
+        if self.client is None:
+            raise Exception("a snapshot needs a client to fetch from")
+        started = int(time.time() * 1000)
+        # the client caches teams (and with them spaces and projects)
+        self.client._teams = None
+        teams = self.client.load_hierarchy()
+        self._write_hierarchy(teams)
+        since = {}  # type: Dict[str, Optional[int]]
+        if incremental:
+            for team in teams:
+                row = self.query(
+                    "SELECT MAX(date_updated) FROM tasks WHERE team_id = ?", team.id
+                )
+                # an update in the same millisecond as the newest one may be new
+                since[team.id] = row[0][0] - 1 if row[0][0] is not None else None
+        else:
+            with self.connection:
+                for table in ("tasks", "task_assignees", "task_tags"):
+                    self.connection.execute(f"DELETE FROM {table}")  # nosec
+
+        kwargs.setdefault("include_closed", True)
+        stream = interleave(
+            self._crawls(teams, since, **kwargs), self.client.max_workers
+        )
+        written = 0
+        batch = {}  # type: Dict[str, List[Task]]
+        for team_id, task in stream:
+            batch.setdefault(team_id, []).append(task)
+            if len(batch[team_id]) >= self.batch_size:
+                written += self._write_task_batch(batch.pop(team_id), team_id)
+        for team_id, tasks in batch.items():
+            written += self._write_task_batch(tasks, team_id)
+        self._prune()
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('refreshed_at', ?)", (started,)
+            )
+        return written
+
+    def export(self, **kwargs: Any) -> int:
+        """
+        rebuilds the snapshot from scratch, returning the number of tasks.
+        keyword arguments are task filters, as for get_all_tasks
+        """
+        return self._sync(incremental=False, **kwargs)
+
+    def refresh(self, **kwargs: Any) -> int:
+        """
+        brings an existing snapshot up to date, re-reading the hierarchy but
+        only fetching tasks updated since the newest one stored per team.
+        the v1 api doesn't report deleted tasks, so run export() now and
+        then to drop them
+        """
+        return self._sync(incremental=True, **kwargs)
+
+    @property
+    def refreshed_at(self) -> Optional[int]:
+        """posix x1000 time the last export or refresh started"""
+        value = self._meta("refreshed_at")
+        return int(value) if value is not None else None
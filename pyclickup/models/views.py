@@ -0,0 +1,200 @@
+"""
+incrementally maintained aggregates over tasks
+"""
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from pyclickup.globals import LIBRARY
+from pyclickup.models import Task
+from pyclickup.utils.serialize import pack_payloads, unpack_payloads
+from pyclickup.utils.text import int_or_none, ref_id, snake_keys, task_priority
+from typing import Any, Dict, Iterable, List, Optional  # noqa
+
+
+GROUPS = ["all", "list", "status", "assignee", "priority"]
+
+
+def task_facts(task: Task, values: Iterable[str]) -> Dict[str, Any]:
+    """the parts of a task the views group and sum by"""
+    status = getattr(task.status, "status", None)
+    return {
+        "all": [None],
+        "list": [ref_id(getattr(task, "list", None))],
+        "status": [status.lower() if status else None],
+        "assignee": sorted({x.id for x in task.assignees}),
+        "priority": [task_priority(getattr(task, "priority", None))],
+        "open": getattr(task.status, "type", None) != "closed",
+        # from the payload, as the naive utc Task.due_date would be read as local
+        "due": int_or_none(snake_keys(task._payload).get("due_date")),
+        "values": {x: getattr(task, x, None) or 0 for x in values},
+    }
+
+
+class _Bucket:
+    """one group of a view: a count, a sum and the sorted due dates of open tasks"""
+
+    __slots__ = ("count", "total", "due")
+
+    def __init__(self) -> None:
+        """constructor"""
+        self.count = 0
+        self.total = 0  # type: Any
+        self.due = []  # type: List[int]
+
+
+class TaskViews:
+    """
+    registered aggregate views over a task collection: the count and the
+    sum of a numeric field per list, status, assignee or priority (or over
+    "all" tasks), plus overdue counts. adding, updating or removing a task
+    only touches the groups it was and is in, so keeping the views current
+    costs the changed tasks rather than the collection. counts and sums are
+    dict lookups, overdue counts a bisect over each group's due dates.
+    with a client, tasks are re-aggregated whenever Task.update succeeds
+    """
+
+    def __init__(self, client: Any = None) -> None:
+        """constructor"""
+        self._views = {}  # type: Dict[str, tuple]
+        self._buckets = {}  # type: Dict[str, Dict[Any, _Bucket]]
+        self._facts = {}  # type: Dict[str, Dict[str, Any]]
+        self._lock = threading.Lock()
+        self.client = client
+        if client:
+            client.subscribe(self.add)
+
+    def __repr__(self):
+        """repr"""
+        return f"<{LIBRARY}.TaskViews {sorted(self._views)} [{len(self)} tasks]>"
+
+    def __len__(self) -> int:
+        """number of tasks aggregated"""
+        return len(self._facts)
+
+    def close(self) -> None:
+        """stops following task updates"""
+        if self.client:
+            self.client.unsubscribe(self.add)
+
+    def register(self, name: str, group_by: str, value: str = None) -> None:
+        """
+        adds a view grouping tasks by one of GROUPS, summing the numeric
+        task field value (like points or time_estimate) if given. tasks
+        already aggregated are counted in right away, but only fields that
+        were being summed when they were added can be
+        """
+        if group_by not in GROUPS:
+            raise Exception(f"can't group by '{group_by}', expected one of {GROUPS}")
+        if value and value not in self._values and self._facts:
+            raise Exception(f"register views summing '{value}' before adding tasks")
+        with self._lock:
+            self._views[name] = (group_by, value)
+            self._buckets[name] = {}
+            for facts in self._facts.values():
+                self._apply(name, facts, 1)
+
+    @property
+    def _values(self) -> List[str]:
+        """the fields summed by any view"""
+        return [y for x, y in self._views.values() if y]
+
+    def _apply(self, name: str, facts: Dict[str, Any], sign: int) -> None:
+        """adds (sign 1) or takes away (sign -1) one task's facts in a view"""
+        group_by, value = self._views[name]
+        buckets = self._buckets[name]
+        for key in facts[group_by]:
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = _Bucket()
+            bucket.count += sign
+            if value:
+                bucket.total += sign * facts["values"].get(value, 0)
+            if facts["open"] and facts["due"] is not None:
+                if sign > 0:
+                    insort(bucket.due, facts["due"])
+                else:
+                    del bucket.due[bisect_left(bucket.due, facts["due"])]
+            if not bucket.count:
+                del buckets[key]
+
+    def _replace(self, task_id: str, facts: Optional[Dict[str, Any]]) -> None:
+        """swaps a task's old facts for new ones (or none) in every view"""
+        with self._lock:
+            old = self._facts.pop(task_id, None)
+            for name in self._views:
+                if old is not None:
+                    self._apply(name, old, -1)
+                if facts is not None:
+                    self._apply(name, facts, 1)
+            if facts is not None:
+                self._facts[task_id] = facts
+
+    def add(self, task: Task) -> None:
+        """aggregates a task, replacing any earlier version of it"""
+        self._replace(str(task.id), task_facts(task, self._values))
+
+    def extend(self, tasks: Iterable[Task]) -> int:
+        """aggregates tasks as they stream in, returning how many were added"""
+        count = 0
+        for task in tasks:
+            self.add(task)
+            count += 1
+        return count
+
+    def remove(self, task_id: str) -> None:
+        """drops a task from every view"""
+        self._replace(task_id, None)
+
+    def count(self, name: str, key: Any = None) -> int:
+        """the number of tasks in a group of a view"""
+        bucket = self._buckets[name].get(key)
+        return bucket.count if bucket else 0
+
+    def sum(self, name: str, key: Any = None) -> Any:
+        """the total of the view's value field in a group"""
+        bucket = self._buckets[name].get(key)
+        return bucket.total if bucket else 0
+
+    def overdue(self, name: str, key: Any = None, now: int = None) -> int:
+        """open tasks in a group due before now (posix x1000, defaults to now)"""
+        bucket = self._buckets[name].get(key)
+        if not bucket:
+            return 0
+        now = int(time.time() * 1000) if now is None else now
+        return bisect_left(bucket.due, now)
+
+    def groups(self, name: str) -> Dict[Any, Dict[str, Any]]:
+        """every group of a view, with its count and sum"""
+        with self._lock:
+            return {
+                x: {"count": y.count, "sum": y.total}
+                for x, y in self._buckets[name].items()
+            }
+
+    def save(self, path: str) -> None:
+        """checkpoints the views and the facts they're built from to a file"""
+        with self._lock:
+            state = {
+                "views": {x: list(y) for x, y in self._views.items()},
+                "facts": self._facts,
+            }
+            blob = pack_payloads([state])
+        partial = f"{path}.partial"
+        with open(partial, "wb") as checkpoint:
+            checkpoint.write(blob)
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(partial, path)
+
+    @classmethod
+    def load(cls, path: str, client: Any = None) -> "TaskViews":
+        """restores views checkpointed with save"""
+        with open(path, "rb") as checkpoint:
+            state = unpack_payloads(checkpoint.read())[0]
+        views = cls(client=client)
+        for name, (group_by, value) in state["views"].items():
+            views.register(name, group_by, value)
+        for task_id, facts in state["facts"].items():
+            views._replace(task_id, facts)
+        return views
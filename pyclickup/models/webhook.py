@@ -0,0 +1,401 @@
+"""
+webhook ingestion, keeping a local copy of the workspace current
+"""
+import hashlib
+import hmac
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pyclickup.globals import LIBRARY
+from pyclickup.models import List, Project, Space, Task
+from pyclickup.utils.text import ref_id, ts_to_datetime
+from socketserver import ThreadingMixIn
+from typing import Any, Dict, Iterator, Optional, Set, Tuple  # noqa
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class TaskStore:
+    """local tasks keyed by id, remembering when each was last changed"""
+
+    def __init__(self) -> None:
+        """constructor"""
+        self.tasks = {}  # type: Dict[str, Task]
+        self._versions = {}  # type: Dict[str, datetime]
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """number of tasks stored"""
+        return len(self.tasks)
+
+    def __contains__(self, task_id: str) -> bool:
+        """is the task stored"""
+        return task_id in self.tasks
+
+    def __iter__(self) -> Iterator[Task]:
+        """iterate a copy of the stored tasks"""
+        with self._lock:
+            return iter(list(self.tasks.values()))
+
+    def items(self) -> list:
+        """a copy of the stored (task id, task) pairs"""
+        with self._lock:
+            return list(self.tasks.items())
+
+    def get(self, task_id: str) -> Optional[Task]:
+        """gets a task by id"""
+        return self.tasks.get(task_id)
+
+    def put(self, task: Task, version: datetime = None) -> bool:
+        """stores the task unless a newer version was already seen"""
+        if task.id is None:
+            return False
+        version = version or task.date_updated or EPOCH
+        with self._lock:
+            if version < self._versions.get(task.id, EPOCH):
+                return False
+            self.tasks[task.id] = task
+            self._versions[task.id] = version
+            return True
+
+    def delete(self, task_id: str, version: datetime = None) -> bool:
+        """removes the task unless it changed after the deletion"""
+        version = version or datetime.utcnow()
+        with self._lock:
+            if version < self._versions.get(task_id, EPOCH):
+                return False
+            self.tasks.pop(task_id, None)
+            self._versions[task_id] = version
+            return True
+
+
+class WebhookCache:
+    """
+    applies clickup webhook events to the client's cached hierarchy
+    (Team._spaces, Space._projects, Project.lists) and to a TaskStore.
+
+    events carrying a full body ("task", "list", "project"/"folder" or
+    "space") are applied directly, and events older than what's stored
+    are dropped. anything that can't be applied from the event alone
+    marks its scope dirty, and reconcile() re-fetches only those scopes
+    """
+
+    def __init__(self, client: Any, store: TaskStore = None) -> None:
+        """constructor"""
+        self.client = client
+        self.store = store or TaskStore()
+        self.dirty_lists = set()  # type: Set[Tuple[str, str]]
+        self.dirty_teams = set()  # type: Set[str]
+        self.dirty_spaces = set()  # type: Set[str]
+        self._versions = {}  # type: Dict[Tuple[str, str], datetime]
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        """repr"""
+        return f"<{LIBRARY}.WebhookCache [{len(self.store)} tasks]>"
+
+    @staticmethod
+    def _event_time(payload: dict) -> datetime:
+        """when the event happened, from its history items if present"""
+        history = payload.get("history_items", [])
+        dates = [int(x["date"]) for x in history if "date" in x]
+        if dates:
+            return ts_to_datetime(max(dates))
+        if payload.get("date"):
+            return ts_to_datetime(payload["date"])
+        return datetime.utcnow()
+
+    def _teams(self) -> list:
+        """the cached teams, without fetching anything"""
+        return self.client._teams or []
+
+    def _cached_space_ids(self) -> Set[str]:
+        """ids of every cached space"""
+        return {y.id for x in self._teams() for y in x._spaces or []}
+
+    def _find_space(self, space_id: str) -> Optional[Space]:
+        """a cached space by id"""
+        for team in self._teams():
+            for space in team._spaces or []:
+                if space.id == space_id:
+                    return space
+        return None
+
+    def _find_project(self, project_id: str) -> Optional[Project]:
+        """a cached project by id"""
+        for team in self._teams():
+            for space in team._spaces or []:
+                for project in space._projects or []:
+                    if project.id == project_id:
+                        return project
+        return None
+
+    def _find_list_team(self, list_id: str) -> Optional[str]:
+        """the team id of a cached list"""
+        for team in self._teams():
+            for space in team._spaces or []:
+                for project in space._projects or []:
+                    if any(x.id == list_id for x in project.lists):
+                        return team.id
+        return None
+
+    def _newer(self, kind: str, item_id: str, when: datetime) -> bool:
+        """records the event time, returning False if a newer event was applied"""
+        key = (kind, item_id)
+        if when < self._versions.get(key, EPOCH):
+            return False
+        self._versions[key] = when
+        return True
+
+    def apply_event(self, payload: dict) -> bool:
+        """applies a webhook event, returning whether anything changed"""
+        event = payload.get("event", "")
+        when = self._event_time(payload)
+        with self._lock:
+            if event.startswith("task"):
+                return self._apply_task(event, payload, when)
+            if event.startswith("list"):
+                return self._apply_list(event, payload, when)
+            if event.startswith(("project", "folder")):
+                return self._apply_project(event, payload, when)
+            if event.startswith("space"):
+                return self._apply_space(event, payload, when)
+        return False
+
+    def _apply_task(self, event: str, payload: dict, when: datetime) -> bool:
+        """task events"""
+        task_id = payload.get("task_id") or payload.get("task", {}).get("id")
+        if event == "taskDeleted":
+            return self.store.delete(task_id, when)
+        if "task" not in payload:
+            list_id = payload.get("list_id")
+            stored = self.store.get(task_id) if task_id else None
+            if not list_id and stored is not None:
+                # the list the task was in when we last saw it
+                list_id = ref_id(getattr(stored, "list", None))
+            team_id = payload.get("team_id") or self._find_list_team(list_id or "")
+            if team_id is None and stored is not None:
+                team_id = getattr(stored, "team_id", None)
+            if team_id and list_id:
+                self.dirty_lists.add((team_id, list_id))
+            elif team_id:
+                self.dirty_teams.add(team_id)
+            else:
+                self.dirty_teams.update(x.id for x in self._teams())
+            return False
+        task = Task(payload["task"], client=self.client)
+        return self.store.put(task, task.date_updated or when)
+
+    def _apply_list(self, event: str, payload: dict, when: datetime) -> bool:
+        """list events"""
+        list_id = payload.get("list_id") or payload.get("list", {}).get("id")
+        project_id = payload.get("project_id") or payload.get("folder_id")
+        project = self._find_project(project_id) if project_id else None
+        if not self._newer("list", list_id, when):
+            return False
+        if project is None:
+            # a project we haven't seen, so whichever space holds it is stale
+            if payload.get("space_id"):
+                self.dirty_spaces.add(payload["space_id"])
+            else:
+                self.dirty_spaces.update(self._cached_space_ids())
+            return False
+        project.lists = [x for x in project.lists if x.id != list_id]
+        if event != "listDeleted":
+            if "list" not in payload:
+                self.dirty_spaces.add(project.space.id)  # type: ignore
+                return False
+            project.lists.append(
+                List(payload["list"], client=self.client, project=project)
+            )
+        return True
+
+    def _apply_project(self, event: str, payload: dict, when: datetime) -> bool:
+        """project (folder) events"""
+        body = payload.get("project") or payload.get("folder") or {}
+        project_id = (
+            payload.get("project_id") or payload.get("folder_id") or body.get("id")
+        )
+        space = self._find_space(payload.get("space_id", ""))
+        if project_id is not None and not self._newer("project", project_id, when):
+            return False
+        if space is None:
+            self.dirty_teams.update(x.id for x in self._teams())
+            return False
+        if space._projects is None:
+            return False
+        if project_id is None:
+            self.dirty_spaces.add(space.id)  # type: ignore
+            return False
+        space._projects = [x for x in space._projects if x.id != project_id]
+        if not event.endswith("Deleted"):
+            if not body:
+                self.dirty_spaces.add(space.id)  # type: ignore
+                return False
+            space._projects.append(Project(body, client=self.client, space=space))
+        return True
+
+    def _apply_space(self, event: str, payload: dict, when: datetime) -> bool:
+        """space events"""
+        body = payload.get("space") or {}
+        space_id = payload.get("space_id") or body.get("id")
+        team = [x for x in self._teams() if x.id == payload.get("team_id")]
+        if space_id is not None and not self._newer("space", space_id, when):
+            return False
+        if not team or team[0]._spaces is None:
+            return False
+        if space_id is None:
+            self.dirty_teams.add(team[0].id)
+            return False
+        team[0]._spaces = [x for x in team[0]._spaces if x.id != space_id]
+        if event != "spaceDeleted":
+            if not body:
+                self.dirty_teams.add(team[0].id)
+                return False
+            team[0]._spaces.append(Space(body, client=self.client, team=team[0]))
+        return True
+
+    def mark_dirty(self, team_id: str, list_id: str = None) -> None:
+        """flags a scope for reconciliation, e.g. after the receiver was down"""
+        with self._lock:
+            if list_id:
+                self.dirty_lists.add((team_id, list_id))
+            else:
+                self.dirty_teams.add(team_id)
+
+    def reconcile(self) -> int:
+        """
+        re-fetches only the dirty scopes, returning how many tasks were stored.
+        if a fetch fails, the scopes not yet re-fetched stay dirty
+        """
+        with self._lock:
+            lists, self.dirty_lists = self.dirty_lists, set()
+            teams, self.dirty_teams = self.dirty_teams, set()
+            spaces, self.dirty_spaces = self.dirty_spaces, set()
+
+        for team in self._teams():
+            if team.id in teams:
+                team._spaces = None
+        for space_id in spaces:
+            space = self._find_space(space_id)
+            if space is not None:
+                space._projects = None
+
+        stored = 0
+        lists = {x for x in lists if x[0] not in teams}
+        scopes = [(x, {}) for x in teams]  # type: list
+        scopes += [(x, {"list_ids": [y]}) for x, y in lists]
+        done = 0
+        try:
+            for team_id, filters in scopes:
+                tasks = self.client._get_all_tasks(
+                    team_id, include_closed=True, subtasks=True, **filters
+                )
+                fetched = {x.id for x in tasks}
+                for task in tasks:
+                    stored += self.store.put(task)
+                self._drop_missing(team_id, filters, fetched)
+                done += 1
+        except Exception:
+            with self._lock:
+                for team_id, filters in scopes[done:]:
+                    if filters:
+                        self.dirty_lists.add((team_id, filters["list_ids"][0]))
+                    else:
+                        self.dirty_teams.add(team_id)
+            raise
+        return stored
+
+    def _drop_missing(self, team_id: str, filters: dict, fetched: Set[str]) -> None:
+        """removes stored tasks in a re-fetched scope that no longer exist"""
+        list_ids = filters.get("list_ids")
+        for task_id, task in self.store.items():
+            if task_id in fetched:
+                continue
+            list_id = (getattr(task, "list", None) or {}).get("id")
+            if list_ids and list_id not in list_ids:
+                continue
+            if not list_ids and getattr(task, "team_id", None) != team_id:
+                continue
+            self.store.delete(task_id)
+
+
+class WebhookReceiver:
+    """
+    a small embeddable http server feeding webhook posts to a WebhookCache.
+    if a secret is given, the X-Signature hmac of each body is verified
+    """
+
+    def __init__(
+        self,
+        cache: WebhookCache,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        secret: str = None,
+    ) -> None:
+        """binds the server, port 0 picks a free one"""
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """webhook post handler"""
+
+            def log_message(self, *args) -> None:  # pylint: disable=arguments-differ
+                """quiet"""
+
+            def do_POST(self) -> None:  # pylint: disable=invalid-name
+                """POST"""
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status = receiver.handle(body, self.headers.get("X-Signature", ""))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        class Server(ThreadingMixIn, HTTPServer):
+            """threaded server"""
+
+            daemon_threads = True
+
+        self.cache = cache
+        self.secret = secret
+        self.server = Server((host, port), Handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """where to point the clickup webhook"""
+        host, port = self.server.socket.getsockname()[:2]
+        return f"http://{host}:{port}/"
+
+    def handle(self, body: bytes, signature: str = "") -> int:
+        """verifies and applies one webhook post, returning the http status"""
+        if self.secret:
+            expected = hmac.new(
+                self.secret.encode("utf-8"), body, hashlib.sha256
+            ).hexdigest()
+            if not hmac.compare_digest(expected, signature):
+                return 401
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400
+        if not isinstance(payload, dict):
+            return 400
+        try:
+            self.cache.apply_event(payload)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            # malformed history_items and the like
+            return 400
+        return 200
+
+    def start(self) -> "WebhookReceiver":
+        """serves in a background thread"""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """shuts the server down"""
+        if self._thread.is_alive():
+            self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,61 @@
+"""
+transport benchmark against the local fake server
+
+    python -m pyclickup.test.benchmark [requests] [workers] [latency]
+
+the fake server only speaks http/1.1, so the http2 client falls back to
+http/1.1 here. this measures its overhead, not the multiplexing win, which
+needs a real h2 endpoint such as api.clickup.com
+"""
+import requests
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pyclickup.globals import TEST_TOKEN
+from pyclickup.models.client import ClickUp
+from pyclickup.test.helpers import FakeClickUpServer
+from typing import Callable
+
+
+def timed(name: str, fetch: Callable[[int], object], count: int, workers: int) -> None:
+    """runs count fetches on workers threads and prints the request rate"""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fetch, range(count)))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {elapsed:7.2f}s {count / elapsed:9.1f} req/s")
+
+
+def main(count: int = 400, workers: int = 16, latency: float = 0.01) -> None:
+    """compares unpooled, pooled http/1.1 and http2 transports"""
+    server = FakeClickUpServer().start()
+    server.latency = latency
+    path = "team/100/task?page={}"
+    try:
+
+        def unpooled(page: int) -> object:
+            url = server.url + path.format(page % 3)
+            return requests.get(url, headers={"Authorization": TEST_TOKEN}).json()
+
+        timed("requests, no pool", unpooled, count, workers)
+        for name, http2 in (("requests, http/1.1 pool", False), ("httpx, http2", True)):
+            try:
+                client = ClickUp(
+                    TEST_TOKEN, api_url=server.url, max_workers=workers, http2=http2
+                )
+                client.transport  # pylint: disable=pointless-statement
+            except Exception as error:
+                print(f"{name:<28} skipped: {error}")
+                continue
+
+            def pooled(page: int, client: ClickUp = client) -> object:
+                return client.get(path.format(page % 3), raw=True)
+
+            timed(name, pooled, count, workers)
+            client.close()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main(*[float(x) if "." in x else int(x) for x in sys.argv[1:]])  # type: ignore
@@ -2,8 +2,10 @@
 configure pytest
 """
 import pytest
-from pyclickup.test.helpers import dbg
-from typing import Any
+from pyclickup.globals import TEST_TOKEN
+from pyclickup.models.client import ClickUp
+from pyclickup.test.helpers import dbg, FakeClickUpServer
+from typing import Any, Iterator
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -16,3 +18,24 @@ def before_all(request: Any) -> None:
 def after_all() -> None:
     """tear down"""
     dbg("[+] end pyclickup tests")
+
+
+@pytest.fixture(scope="session")
+def fake_server() -> Iterator[FakeClickUpServer]:
+    """a local fake clickup api for offline tests"""
+    server = FakeClickUpServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake(fake_server: FakeClickUpServer) -> FakeClickUpServer:
+    """the fake server, with a clean request log"""
+    fake_server.reset()
+    return fake_server
+
+
+@pytest.fixture
+def fake_client(fake: FakeClickUpServer) -> ClickUp:
+    """a client pointed at the fake server"""
+    return ClickUp(TEST_TOKEN, api_url=fake.url)
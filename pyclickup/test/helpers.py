@@ -2,13 +2,24 @@
 helpers for the pytest suite
 """
 import json
+import re
 import sys
+import threading
+import time
 from colorama import init, Fore, Style
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlsplit
+from typing import Any  # noqa
 
 
 init()
 
 
+FAKE_PAGE_SIZE = 100
+FAKE_BASE_TS = 1_500_000_000_000
+
+
 def dbg(text: str) -> None:
     """debug printer for tests"""
     if isinstance(text, dict):
@@ -21,3 +32,304 @@ def dbg(text: str) -> None:
     print("-----")
     print(Style.RESET_ALL)
     print("")
+
+
+def fake_user(user_id: int) -> dict:
+    """a user payload"""
+    return {
+        "id": user_id,
+        "username": f"user {user_id}",
+        "color": "#ff00df",
+        "profilePicture": None,
+    }
+
+
+def fake_task(index: int, team_id: str, space_id: str, list_id: str) -> dict:
+    """a task payload"""
+    created = FAKE_BASE_TS + index * 60_000
+    closed = index % 7 == 0
+    return {
+        "id": f"t{index}",
+        "name": f"task number {index}",
+        "content": "ship the thing" if index % 3 == 0 else "review the other thing",
+        "status": {
+            "status": "Closed" if closed else "Open",
+            "type": "closed" if closed else "open",
+            "orderindex": 4 if closed else 0,
+            "color": "#6bc950",
+        },
+        "orderindex": str(index),
+        "dateCreated": str(created),
+        "dateUpdated": str(created + 1000),
+        "dateClosed": str(created + 2000) if closed else None,
+        "creator": fake_user(1),
+        "assignees": [fake_user(1 + index % 3)],
+        "tags": [{"name": "bug" if index % 2 else "feature"}],
+        "parent": None,
+        "priority": index % 5,
+        "dueDate": str(created + 86_400_000) if index % 4 == 0 else None,
+        "startDate": None,
+        "points": None,
+        "timeEstimate": None,
+        "list": {"id": list_id},
+        "project": {"id": f"{space_id}-p"},
+        "space": {"id": space_id},
+        "url": f"https://app.clickup.com/t/t{index}",
+        "teamId": team_id,
+    }
+
+
+class FakeClickUpData:
+    """an in-memory clickup workspace served by the fake server"""
+
+    def __init__(self, teams: int = 2, spaces: int = 2, tasks_per_list: int = 60):
+        """generates a deterministic workspace"""
+        self.teams = []  # type: list
+        self.spaces = {}  # type: dict
+        self.projects = {}  # type: dict
+        self.tasks = []  # type: list
+        index = 0
+        for team_number in range(1, teams + 1):
+            team_id = str(team_number * 100)
+            self.teams.append(
+                {
+                    "id": team_id,
+                    "name": f"team {team_id}",
+                    "color": "#ff00df",
+                    "avatar": None,
+                    "members": [fake_user(1), fake_user(2), fake_user(3)],
+                }
+            )
+            self.spaces[team_id] = []
+            for space_number in range(1, spaces + 1):
+                space_id = f"{team_id}-{space_number}"
+                self.spaces[team_id].append(
+                    {
+                        "id": space_id,
+                        "name": f"space {space_id}",
+                        "private": False,
+                        "statuses": [
+                            {"status": "Open", "type": "open", "orderindex": 0},
+                            {"status": "Closed", "type": "closed", "orderindex": 1},
+                        ],
+                        "multiple_assignees": True,
+                    }
+                )
+                lists = [
+                    {"id": f"{space_id}-l{x}", "name": f"list {x}"} for x in (1, 2)
+                ]
+                self.projects[space_id] = [
+                    {
+                        "id": f"{space_id}-p",
+                        "name": f"project {space_id}",
+                        "override_statuses": False,
+                        "statuses": [],
+                        "lists": lists,
+                    }
+                ]
+                for list_data in lists:
+                    for _ in range(tasks_per_list):
+                        self.tasks.append(
+                            fake_task(index, team_id, space_id, list_data["id"])
+                        )
+                        index += 1
+
+    def find_tasks(self, team_id: str, query: dict) -> list:
+        """applies the supported server side filters"""
+
+        def listed(key: str) -> list:
+            values = query.get(f"{key}[]", [])
+            return [y for x in values for y in x.split(",") if y]
+
+        def bound(key: str, default: float) -> float:
+            return float(query[key][0]) if key in query else default
+
+        spaces, projects, lists = (
+            listed("space_ids"),
+            listed("project_ids"),
+            listed("list_ids"),
+        )
+        statuses = [x.lower() for x in listed("statuses")]
+        assignees = [int(x) for x in listed("assignees")]
+        include_closed = query.get("include_closed", ["false"])[0] == "true"
+        created_gt = bound("date_created_gt", float("-inf"))
+        created_lt = bound("date_created_lt", float("inf"))
+        updated_gt = bound("date_updated_gt", float("-inf"))
+        updated_lt = bound("date_updated_lt", float("inf"))
+
+        found = []
+        for task in self.tasks:
+            if task["teamId"] != team_id:
+                continue
+            if spaces and task["space"]["id"] not in spaces:
+                continue
+            if projects and task["project"]["id"] not in projects:
+                continue
+            if lists and task["list"]["id"] not in lists:
+                continue
+            if statuses and task["status"]["status"].lower() not in statuses:
+                continue
+            if assignees and not {x["id"] for x in task["assignees"]} & set(assignees):
+                continue
+            if task["status"]["type"] == "closed" and not include_closed:
+                continue
+            if not created_gt < int(task["dateCreated"]) < created_lt:
+                continue
+            if not updated_gt < int(task["dateUpdated"]) < updated_lt:
+                continue
+            found.append(task)
+        if query.get("reverse", ["false"])[0] == "true":
+            found.reverse()
+        return found
+
+
+class FakeClickUpHandler(BaseHTTPRequestHandler):
+    """request handler mimicking the parts of the clickup v1 api we use"""
+
+    protocol_version = "HTTP/1.1"
+    server = None  # type: Any
+    remaining = 0
+
+    def log_message(self, *args) -> None:  # pylint: disable=arguments-differ
+        """silence the default stderr logging"""
+
+    def _send(self, payload: dict, status: int = 200) -> None:
+        """writes a json response"""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Remaining", str(max(self.remaining, 0)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict:
+        """reads a form or json request body"""
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8") if length else ""
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {x: y[-1] for x, y in parse_qs(raw).items()}
+
+    def _route(self, method: str) -> None:
+        """dispatches a request against the fake workspace"""
+        fake = self.server
+        url = urlsplit(self.path)
+        path = url.path[len(fake.prefix) :].strip("/")
+        query = parse_qs(url.query)
+        fake.record(method, path, query)
+        self.remaining = fake.spend(self.headers.get("Authorization", ""))
+        body = self._body() if method in ("POST", "PUT") else {}
+        if self.remaining < 0:
+            self._send({"err": "rate limited"}, status=429)
+            return
+        if fake.latency:
+            time.sleep(fake.latency)
+        if fake.fail_with:
+            self._send({"err": "fake failure"}, status=fake.fail_with)
+            return
+        data = fake.data
+
+        if method == "GET" and path == "user":
+            self._send({"user": fake_user(1)})
+        elif method == "GET" and path == "team":
+            self._send({"teams": data.teams})
+        elif method == "GET" and re.match(r"^team/[^/]+$", path):
+            self._send({"team": [x for x in data.teams if x["id"] == path[5:]][0]})
+        elif method == "GET" and re.match(r"^team/[^/]+/space$", path):
+            self._send({"spaces": data.spaces.get(path.split("/")[1], [])})
+        elif method == "GET" and re.match(r"^space/[^/]+/project$", path):
+            self._send({"projects": data.projects.get(path.split("/")[1], [])})
+        elif method == "GET" and re.match(r"^team/[^/]+/task$", path):
+            tasks = data.find_tasks(path.split("/")[1], query)
+            page = int(query.get("page", ["0"])[0])
+            start = page * fake.page_size
+            self._send({"tasks": tasks[start : start + fake.page_size]})
+        elif method == "PUT" and re.match(r"^task/[^/]+$", path):
+            self._send({"id": path.split("/")[1]})
+        elif method == "PUT" and re.match(r"^list/[^/]+$", path):
+            self._send({"id": path.split("/")[1], "name": body.get("name")})
+        elif method == "POST" and re.match(r"^list/[^/]+/task$", path):
+            self._send({"id": f"new-{len(fake.requests)}"})
+        elif method == "POST" and re.match(r"^project/[^/]+/list$", path):
+            self._send({"id": f"new-{len(fake.requests)}", "name": body.get("name")})
+        else:
+            self._send({"err": f"no route for {method} {path}"}, status=404)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """GET"""
+        self._route("GET")
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """POST"""
+        self._route("POST")
+
+    def do_PUT(self) -> None:  # pylint: disable=invalid-name
+        """PUT"""
+        self._route("PUT")
+
+
+class FakeClickUpServer(ThreadingMixIn, HTTPServer):
+    """a local stand-in for the clickup api, since the apiary mock is gone"""
+
+    daemon_threads = True
+    prefix = "/api/v1/"
+
+    def __init__(self, data: FakeClickUpData = None, page_size: int = FAKE_PAGE_SIZE):
+        """binds to a random local port"""
+        super().__init__(("127.0.0.1", 0), FakeClickUpHandler)
+        self.data = data or FakeClickUpData()
+        self.page_size = page_size
+        self.latency = 0.0
+        self.fail_with = 0
+        self.rate_remaining = 100
+        self.budgets = {}  # type: dict
+        self.by_token = {}  # type: dict
+        self.requests = []  # type: list
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """the api url to hand to a client"""
+        return f"http://127.0.0.1:{self.server_address[1]}{self.prefix}"
+
+    def record(self, method: str, path: str, query: dict) -> None:
+        """keeps a log of every request made"""
+        with self._lock:
+            self.requests.append((method, path, query))
+
+    def spend(self, token: str) -> int:
+        """
+        counts a request against its token, returning the rate limit left.
+        tokens in budgets get that many requests, then 429s
+        """
+        with self._lock:
+            self.by_token[token] = self.by_token.get(token, 0) + 1
+            if token not in self.budgets:
+                return self.rate_remaining
+            self.budgets[token] -= 1
+            return self.budgets[token]
+
+    def reset(self) -> None:
+        """clears the request log and any injected behavior"""
+        with self._lock:
+            self.requests = []
+            self.budgets = {}
+            self.by_token = {}
+        self.latency = 0.0
+        self.fail_with = 0
+        self.rate_remaining = 100
+
+    def start(self) -> "FakeClickUpServer":
+        """serves in a background thread"""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """shuts the server down"""
+        self.shutdown()
+        self.server_close()
@@ -1,8 +1,24 @@
 """
 a base test suite for pyclickup
 """
+import csv
+import hashlib
+import hmac
+import json
+import os
+import pickle
+import pyclickup
+import pytest
+import requests
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from pyclickup.models import (
+    dump_tasks,
+    load_tasks,
     LIBRARY,
     List,
     Project,
@@ -13,7 +29,20 @@ from pyclickup.models import (
     Team,
     User,
 )
+from pyclickup.cli import main
 from pyclickup.models.client import test_client, ClickUp
+from pyclickup.models.diff import HashIndex
+from pyclickup.models.index import TaskIndex
+from pyclickup.models.journal import Journal
+from pyclickup.models.pool import ClickUpPool
+from pyclickup.models.views import TaskViews
+from pyclickup.models.error import RateLimited
+from pyclickup.models.query import TaskQuery
+from pyclickup.models.snapshot import Snapshot
+from pyclickup.models.webhook import WebhookCache, WebhookReceiver
+from pyclickup.test.helpers import dbg, FAKE_BASE_TS, fake_task
+from pyclickup.utils.concurrency import AdaptiveLimiter, HedgeBudget, SingleFlight
+from pyclickup.utils.text import endpoint_key
 from pyclickup.globals import __version__, TEST_TOKEN
 
 
@@ -161,3 +190,638 @@ def test_tasks():
 
     all_tasks_for_team = team.get_all_tasks(page_limit=4)
     assert is_list_of_type(all_tasks_for_team, Task)
+
+
+def test_tasks_everywhere(fake_client):
+    """testing the concurrent crawl across every team and space"""
+    by_team = fake_client.get_all_tasks_everywhere(include_closed=True)
+    assert is_list_of_type(by_team, Task)
+    assert len(by_team) == 480
+    assert len({x.id for x in by_team}) == 480
+
+    by_space = list(
+        fake_client.iter_tasks_everywhere(scope="space", include_closed=True)
+    )
+    assert {x.id for x in by_space} == {x.id for x in by_team}
+
+    open_only = fake_client.get_all_tasks_everywhere(max_workers=1)
+    assert all(x.status.type != "closed" for x in open_only)
+    assert len(open_only) < len(by_team)
+
+
+def test_task_query(fake, fake_client):
+    """testing the task query builder, pushdown and splitting"""
+    team = fake_client.teams[0]
+    query = (
+        TaskQuery()
+        .lists("100-1-l1", "100-2-l2")
+        .statuses("Open", "in progress")
+        .assignees(2)
+        .where(lambda task: "review" in task.content)
+    )
+    tasks = list(team.query_tasks(query))
+    assert tasks
+    for task in tasks:
+        assert task.list["id"] in ("100-1-l1", "100-2-l2")
+        assert task.status.status == "Open"
+        assert [x.id for x in task.assignees] == [2]
+        assert "review" in task.content
+
+    path = fake_client._task_path("1", {"statuses": ["in progress"], "reverse": True})
+    assert path == "team/1/task?statuses[]=in%20progress&reverse=true"
+
+    fake.reset()
+    lists = [f"{x}-{y}-l{z}" for x in (100, 200) for y in (1, 2) for z in (1, 2)]
+    padding = [f"missing-list-{x:04}" for x in range(300)]
+    wide = TaskQuery().lists(*padding, *lists).include_closed().ids("t0", "t61")
+    assert [x.id for x in team.query_tasks(wide)] in (["t0", "t61"], ["t61", "t0"])
+    assert len({str(x[2]) for x in fake.requests}) > 2
+
+
+def test_sharded_crawl(fake, fake_client, monkeypatch):
+    """testing that a date sharded crawl matches a paged crawl"""
+    team = fake_client.teams[0]
+    paged = team.get_all_tasks(include_closed=True)
+    fake.reset()
+    sharded = team.get_all_tasks(shards=4, include_closed=True)
+    assert len(sharded) == len(paged) == 240
+    assert {x.id for x in sharded} == {x.id for x in paged}
+    assert all("page" in x[2] and x[2]["page"] == ["0"] for x in fake.requests)
+
+    recent = team.get_all_tasks(
+        shards=3, date_created_gt=1_500_000_000_000 + 200 * 60_000
+    )
+    assert {x.id for x in recent} == {
+        x.id for x in paged if x.status.type != "closed" and int(x.id[1:]) > 200
+    }
+
+    # a shard too narrow to split pages on from its first page
+    monkeypatch.setattr(pyclickup.models.client, "MIN_SHARD_MS", 10 ** 15)
+    fake.reset()
+    whole = team.get_all_tasks(shards=4, include_closed=True)
+    assert {x.id for x in whole} == {x.id for x in paged}
+    assert [x[2]["page"] for x in fake.requests] == [["0"], ["1"], ["2"]]
+    with pytest.raises(Exception):
+        team.get_all_tasks(shards=4, page_limit=1)
+    with pytest.raises(Exception):
+        team.get_all_tasks(shards=4, prefetch=2)
+
+
+def test_process_pool_parsing(fake_client):
+    """testing that process pool parsing keeps page order and reattaches the client"""
+    team = fake_client.teams[0]
+    serial = team.get_all_tasks(include_closed=True)
+    pipelined = team.get_all_tasks(processes=2, include_closed=True)
+    assert [x.id for x in pipelined] == [x.id for x in serial]
+    assert all(x._client is fake_client for x in pipelined)
+    assert pipelined[0].creator._client is fake_client
+    assert pipelined[0].date_created == serial[0].date_created
+
+    limited = team.get_all_tasks(processes=2, page_limit=1, include_closed=True)
+    assert [x.id for x in limited] == [x.id for x in serial[:100]]
+
+
+def test_pickling(fake_client):
+    """testing that models pickle without their client or parents"""
+    team = fake_client.teams[0]
+    project = team.spaces[0].projects[0]
+
+    loaded_project = pickle.loads(pickle.dumps(project))
+    assert loaded_project._client is None
+    assert loaded_project.space is None
+    assert loaded_project.lists[0].project is loaded_project
+    assert loaded_project.lists[0].id == project.lists[0].id
+
+    blob = pickle.dumps(project.lists[0])
+    assert TEST_TOKEN.encode() not in blob
+    assert b"space" not in blob
+
+    tasks = team.get_all_tasks(page_limit=1)
+    task = pickle.loads(pickle.dumps(tasks[0])).attach(fake_client)
+    assert task._client is fake_client
+    assert task.assignees[0]._client is fake_client
+    assert task.due_date == tasks[0].due_date
+    assert task._json == tasks[0]._json
+
+    loaded = load_tasks(dump_tasks(tasks), client=fake_client)
+    assert [x.id for x in loaded] == [x.id for x in tasks]
+    assert loaded[-1].date_created == tasks[-1].date_created
+    assert loaded[0]._client is fake_client
+
+
+def test_webhook_cache(fake, fake_client):
+    """testing webhook events against the cached hierarchy and task store"""
+    team = fake_client.teams[0]
+    project = team.spaces[0].projects[0]
+    cache = WebhookCache(fake_client)
+    payload = fake_task(5, team.id, "100-1", "100-1-l1")
+
+    assert cache.apply_event({"event": "taskCreated", "task": payload})
+    stale = {**payload, "name": "stale", "dateUpdated": str(FAKE_BASE_TS)}
+    assert not cache.apply_event({"event": "taskUpdated", "task": stale})
+    assert cache.store.get("t5").name == "task number 5"
+    assert not cache.apply_event({"event": "taskUpdated", "task_id": "t5"})
+    assert cache.dirty_lists == {("100", "100-1-l1")} and not cache.dirty_teams
+    cache.dirty_lists.clear()
+
+    later = str(int(payload["dateUpdated"]) + 5000)
+    deleted = {
+        "event": "taskDeleted",
+        "task_id": "t5",
+        "history_items": [{"date": later}],
+    }
+    assert cache.apply_event(deleted)
+    assert "t5" not in cache.store
+
+    created = {"event": "listCreated", "project_id": project.id, "list": {"id": "n1"}}
+    assert cache.apply_event(created)
+    assert project.lists[-1].id == "n1" and project.lists[-1].project is project
+
+    fake.budgets = {TEST_TOKEN: 0}
+    cache.mark_dirty("100", "100-1-l2")
+    try:
+        with pytest.raises(RateLimited):
+            cache.reconcile()
+    finally:
+        fake.budgets = {}
+    assert cache.dirty_lists == {("100", "100-1-l2")}
+    cache.dirty_lists.clear()
+
+    fake.reset()
+    assert not cache.apply_event({"event": "taskMoved", "list_id": "100-1-l2"})
+    assert cache.reconcile() == 60
+    assert fake.requests[0][2]["subtasks"] == ["true"]
+    assert [x[1] for x in fake.requests] == ["team/100/task"] * 2
+    assert fake.requests[0][2]["list_ids[]"] == ["100-1-l2"]
+
+    receiver = WebhookReceiver(cache, secret="shh").start()
+    body = json.dumps({"event": "taskCreated", "task": payload}).encode()
+    signature = hmac.new(b"shh", body, hashlib.sha256).hexdigest()
+    assert requests.post(receiver.url, data=body).status_code == 401
+    response = requests.post(
+        receiver.url, data=body, headers={"X-Signature": signature}
+    )
+    receiver.stop()
+    assert response.status_code == 200
+    assert "t5" not in cache.store  # deleted after this version
+
+    receiver = WebhookReceiver(cache)
+    assert receiver.handle(b"[1, 2]") == 400
+    malformed = {"event": "taskUpdated", "history_items": [{"date": "soon"}]}
+    assert receiver.handle(json.dumps(malformed).encode()) == 400
+    receiver.stop()
+
+
+def test_single_flight(fake):
+    """testing that concurrent identical gets share one request"""
+    client = ClickUp(TEST_TOKEN, api_url=fake.url)
+    fake.latency = 0.2
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        teams = list(pool.map(lambda _: client.teams, range(8)))
+        assert all(x is teams[0] for x in teams)
+        spaces = list(pool.map(lambda _: teams[0][0].spaces, range(8)))
+        assert all(x is spaces[0] for x in spaces)
+    assert [x[1] for x in fake.requests] == ["team", "team/100/space"]
+
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: int("nope"))
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_adaptive_concurrency(fake):
+    """testing the AIMD limiter and the parallel paths it gates"""
+    limiter = AdaptiveLimiter(initial=2, maximum=4)
+    for _ in range(10):
+        limiter.release(limiter.acquire())
+    assert limiter.limit == 4
+    limiter.release(limiter.acquire(), rate_limited=True)
+    assert limiter.limit == 2
+    assert [x[2] for x in limiter.metrics()["history"]][-1] == "429"
+
+    client = ClickUp(TEST_TOKEN, api_url=fake.url, adaptive=True, max_workers=8)
+    teams = client.load_hierarchy()
+    assert all(x._projects for x in teams[1]._spaces)
+    tasks = teams[0].get_all_tasks(prefetch=3, include_closed=True)
+    serial = teams[0].get_all_tasks(include_closed=True)
+    assert [x.id for x in tasks] == [x.id for x in serial]
+
+    new_ids = teams[0].spaces[0].projects[0].lists[0].create_tasks(
+        [{"name": f"bulk {x}"} for x in range(5)]
+    )
+    assert len(new_ids) == 5 and all(x.startswith("new-") for x in new_ids)
+    updated = client.update_tasks([(x, {"name": "renamed"}) for x in tasks[:3]])
+    assert [x["id"] for x in updated] == [x.id for x in tasks[:3]]
+    assert client.concurrency_metrics["in_flight"] == 0
+
+    client.retries = 0
+    fake.fail_with = 429
+    with pytest.raises(RateLimited):
+        client.get("team")
+    assert client.concurrency_metrics["history"][-1][2] == "429"
+
+
+def test_transports(fake):
+    """testing the pooled http/1.1 and http2 transports"""
+    client = ClickUp(TEST_TOKEN, api_url=fake.url)
+    assert isinstance(client.transport, requests.Session)
+    assert client.transport is client.transport
+    assert client.teams[0].id == "100"
+    client.close()
+    assert client._transport is None
+
+    httpx = pytest.importorskip("httpx")
+    client = ClickUp(TEST_TOKEN, api_url=fake.url, http2=True)
+    assert isinstance(client.transport, httpx.Client)
+    assert len(client.teams[0].get_tasks(page=0)) == 100
+    client.close()
+
+
+def test_timeouts_and_hedging(fake, monkeypatch):
+    """testing per-endpoint timeouts, retries on timeout and hedged gets"""
+    assert endpoint_key("team/1234/task?page=3") == "team/*/task"
+    client = ClickUp(
+        TEST_TOKEN, api_url=fake.url, retries=1, timeouts={"team": (1.0, 0.1)}
+    )
+    assert client._timeout("team/*/task") == (3.05, 60.0)
+    fake.latency = 0.3
+    with pytest.raises(requests.exceptions.Timeout):
+        client.get("team")
+    assert len(fake.requests) == 2
+
+    fake.reset()
+    client = ClickUp(TEST_TOKEN, api_url=fake.url, hedge=True, hedge_budget=0.5)
+    for _ in range(20):
+        client.get("team", raw=True)
+    assert client.latencies.percentile("team") is not None
+    fake.latency = 0.2
+    assert client.get("user", raw=True).status_code == 200
+    client.latencies._samples["user"] = client.latencies._samples["team"]
+    assert client.get("user", raw=True).status_code == 200
+    assert client.hedge_budget.hedges == 1
+    assert [x[1] for x in fake.requests].count("user") == 3
+
+    # the first request fails just as the hedge succeeds, and both have
+    # finished by the time the hedge is waited on
+    send, calls, hedged = client._send, [], threading.Event()
+
+    def flaky(*args):
+        calls.append(args)
+        if len(calls) % 2:
+            hedged.wait()
+            raise requests.exceptions.ConnectionError()
+        hedged.set()
+        return send(*args)
+
+    def late_wait(futures, **kwargs):
+        if len(futures) > 1:
+            time.sleep(0.1)
+        return wait(futures, **kwargs)
+
+    monkeypatch.setattr(pyclickup.models.client, "wait", late_wait)
+    fake.latency = 0
+    client._send = flaky
+    client.hedge_budget = HedgeBudget(1.0)
+    for _ in range(5):
+        hedged.clear()
+        assert client.get("user", raw=True).status_code == 200
+    client.close()
+
+
+IMPORT_BUDGET_US = 100_000
+HEAVY_MODULES = ["requests", "urllib3", "multiprocessing", "http.server", "httpx"]
+
+
+def test_import_time():
+    """testing that importing pyclickup defers the http stack"""
+    root = os.path.dirname(os.path.dirname(pyclickup.__file__))
+    script = "import sys, pyclickup; pyclickup.ClickUp; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-S", "-X", "importtime", "-c", script],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    modules = result.stdout.split()
+    assert "pyclickup.models.client" in modules
+    assert not [x for x in HEAVY_MODULES if x in modules]
+
+    timings = [x.split("|") for x in result.stderr.splitlines() if "|" in x]
+    total = sum(int(x[0].split(":")[1]) for x in timings[1:])
+    dbg(f"import pyclickup took {total}us")
+    assert total < IMPORT_BUDGET_US
+
+
+def test_snapshot(fake, fake_client, tmp_path):
+    """testing the sqlite workspace snapshot and its incremental refresh"""
+    snapshot = Snapshot(str(tmp_path / "workspace.db"), client=fake_client)
+    assert snapshot.export() == 480
+    assert snapshot.query("SELECT COUNT(*) FROM spaces") == [(4,)]
+    assert snapshot.query("SELECT COUNT(*) FROM lists") == [(8,)]
+    assert snapshot.query(
+        "SELECT COUNT(*) FROM tasks WHERE list_id = ? AND status = 'Open'", "100-1-l1"
+    ) == [(51,)]
+    assert snapshot.query(
+        "SELECT COUNT(*) FROM task_assignees WHERE user_id = 2"
+    ) == [(160,)]
+    plan = snapshot.query(
+        "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE due_date > 0"
+    )
+    assert "tasks_due_date" in str(plan)
+    assert snapshot.refreshed_at
+
+    original = fake.data.tasks[3]
+    fake.data.tasks[3] = {
+        **original,
+        "name": "renamed",
+        "dateUpdated": str(int(original["dateUpdated"]) + 10 ** 9),
+    }
+    try:
+        assert snapshot.refresh() < 10
+    finally:
+        fake.data.tasks[3] = original
+    assert snapshot.query("SELECT name FROM tasks WHERE id = 't3'") == [("renamed",)]
+    assert snapshot.query("SELECT COUNT(*) FROM tasks") == [(480,)]
+
+    gone = fake.data.teams.pop()
+    fake.data.spaces["100"].append({**fake.data.spaces["100"][0], "id": "100-3"})
+    try:
+        snapshot.refresh()
+    finally:
+        fake.data.teams.append(gone)
+        fake.data.spaces["100"].pop()
+    assert snapshot.query("SELECT id FROM teams") == [("100",)]
+    assert snapshot.query("SELECT COUNT(*) FROM spaces") == [(3,)]
+    assert snapshot.query("SELECT COUNT(*) FROM tasks") == [(240,)]
+    snapshot.close()
+
+
+def test_task_diff(fake_client, tmp_path):
+    """testing change detection against a stored hash index"""
+    tasks = fake_client.teams[0].get_all_tasks(include_closed=True)
+    path = str(tmp_path / "hashes.db")
+    index = HashIndex(path, batch_size=50)
+    first = index.diff(tasks)
+    assert len(first.added) == 240 and not first.removed and not first.changed
+    index.close()
+
+    index = HashIndex(path)
+    assert len(index) == 240
+    assert not index.diff(iter(tasks))
+
+    renamed = Task({**tasks[0]._payload, "name": "renamed", "priority": 4})
+    changes = index.diff([renamed] + tasks[2:])
+    assert changes.changed == {tasks[0].id: ["name", "priority"]}
+    assert changes.removed == [tasks[1].id]
+    assert not changes.added
+    assert "~1" in repr(changes)
+    index.close()
+
+
+def test_export_cli(fake, tmp_path, capsys):
+    """testing the streaming export command"""
+    base = ["export", "--token", TEST_TOKEN, "--api-url", fake.url]
+    ndjson = str(tmp_path / "tasks.ndjson")
+    assert main(base + ["--team", "100", "--include-closed", "-o", ndjson]) == 0
+    with open(ndjson) as lines:
+        tasks = [json.loads(x) for x in lines]
+    assert len(tasks) == 240 and len({x["id"] for x in tasks}) == 240
+    assert "240 tasks" in capsys.readouterr().err
+
+    # the team is looked up from the space
+    path = str(tmp_path / "tasks.csv")
+    args = ["--space", "200-1", "--status", "Open", "--format", "csv", "-o", path]
+    assert main(base + args + ["--shards", "2"]) == 0
+    with open(path) as rows:
+        tasks = list(csv.DictReader(rows))
+    assert len(tasks) == 103
+    assert {(x["space_id"], x["status"]) for x in tasks} == {("200-1", "Open")}
+    assert "tasks/s" in capsys.readouterr().err
+
+    assert main(base + ["--format", "parquet"]) == 1
+    assert "--output" in capsys.readouterr().err
+
+
+def test_task_index(fake_client):
+    """testing the local task index against linear scans"""
+    index = TaskIndex(client=fake_client)
+    tasks = fake_client.teams[0].iter_all_tasks(include_closed=True)
+    assert index.extend(tasks) == 240
+    everything = index.search()
+    assert len(everything) == 240 and "t3" in index
+
+    def scan(check):
+        return [x for x in everything if check(x)]
+
+    assert index.search("SHIP") == scan(lambda x: "ship" in x.content)
+    assert index.search("the thing", tag="bug", status="open") == scan(
+        lambda x: {"the", "thing"} <= set(x.content.split())
+        and x.tags[0].name == "bug"
+        and x.status.status == "Open"
+    )
+    assert index.search(priority=2, assignee=3, list_id="100-1-l2") == scan(
+        lambda x: x.priority == 2
+        and x.assignees[0].id == 3
+        and x.list["id"] == "100-1-l2"
+    )
+    assert not index.search("ship", "nope")
+    assert index.search("!!!") == [] and index.search("-", tag="bug") == []
+
+    task = index.get("t3")
+    hashes = HashIndex()
+    hashes.diff([task])
+    task.update(name="urgent deploy", status="Closed", add_assignees=[9])
+    assert task._payload["name"] == "urgent deploy"
+    assert task._payload["status"]["status"] == "Closed"
+    assert [x["id"] for x in task._payload["assignees"]] == [1, 9]
+    restored = load_tasks(dump_tasks([task]))[0]
+    assert restored.name == "urgent deploy" and restored.assignees[1].id == 9
+    assert hashes.diff([task]).changed == {"t3": ["assignees", "name", "status"]}
+    assert index.search("deploy", status="closed", assignee=9) == [task]
+    assert task not in index.search("number")
+
+    index.remove("t3")
+    index.close()
+    assert not index.search("deploy") and len(index) == 239
+    assert not fake_client._listeners
+
+
+def test_write_behind_journal(fake, tmp_path):
+    """testing queued mutations, their replay and failures"""
+    path = str(tmp_path / "journal.db")
+    client = ClickUp(TEST_TOKEN, api_url=fake.url, journal=path)
+    fake.latency = 0.02
+    try:
+        task = client.teams[0].get_all_tasks(page_limit=1)[0]
+        updated = []
+        client.subscribe(updated.append)
+        queued = task.update(name="renamed")
+        assert queued["id"] is None and task.name != "renamed"
+        for number in range(5):
+            client.put("task/t1", data={"name": f"take {number}"})
+        lists = client.teams[0].spaces[0].projects[0].lists
+        assert lists[0].rename("new name")["queued"]
+        assert lists[0].name != "new name"
+        created = lists[1].create_task("queued task")
+        assert created["id"] is None and created["queued"] > queued["queued"]
+        assert client.journal.depth
+        assert client.journal.flush(timeout=10)
+        assert task.name == "renamed" and updated == [task]
+        assert lists[0].name == lists[0]._payload["name"] == "new name"
+
+        # a rejected update leaves the task as it was
+        fake.fail_with = 400
+        task.update(name="rejected")
+        assert client.journal.flush(timeout=10)
+        assert task.name == "renamed" and updated == [task]
+    finally:
+        fake.latency = 0
+        fake.fail_with = 0
+    entry = client.journal.entry(queued["queued"])
+    assert entry["state"] == "done" and entry["response"] == {"id": task.id}
+    metrics = client.journal.metrics()
+    assert metrics["sent"] == 8 and metrics["failed"] == 1 and metrics["depth"] == 0
+    assert metrics["flush_latency_p95"] >= metrics["flush_latency_p50"] > 0
+    finished = client.journal._query(
+        "SELECT finished FROM entries WHERE path = 'task/t1' ORDER BY id"
+    )
+    assert finished == sorted(finished)
+    client.close()
+
+    # entries left in flight by a crash are sent again, finished ones aren't
+    client = ClickUp(TEST_TOKEN, api_url=fake.url)
+    journal = Journal(client, path, start=False)
+    for number in range(3):
+        journal.append("put", f"list/l{number}", {"data": {"name": "x"}})
+    journal._query("UPDATE entries SET state = 'sending' WHERE path = 'list/l0'")
+    journal.close(flush=False)
+    fake.reset()
+    journal = Journal(client, path)
+    assert journal.flush(timeout=10)
+    assert sorted(x[1] for x in fake.requests) == ["list/l0", "list/l1", "list/l2"]
+
+    fake.fail_with = 400
+    try:
+        entry_id = journal.append("post", "list/l0/task", {"data": {"name": "x"}})
+        assert journal.flush(timeout=10)
+    finally:
+        fake.fail_with = 0
+    entry = journal.entry(entry_id)
+    assert entry["state"] == "failed" and entry["status"] == 400
+    assert entry["attempts"] == 1 and entry["response"] == {"err": "fake failure"}
+    journal.close()
+
+
+def test_client_pool(fake, tmp_path):
+    """testing requests spread over several tokens"""
+    fake.budgets = {"token-a": 0}
+    pool = ClickUpPool(["token-a", "token-b", "token-c"], api_url=fake.url)
+    assert pool.max_workers == 12
+    teams = pool.load_hierarchy()
+    tasks = list(pool._iter_all_tasks(teams[0].id, include_closed=True))
+    assert sorted(x.id for x in tasks) == sorted(f"t{x}" for x in range(240))
+    assert teams[1].spaces[1].projects[0].lists[1].id == "200-2-l2"
+
+    stats = pool.stats()
+    assert [x["token"] for x in stats] == ["...en-a", "...en-b", "...en-c"]
+    assert stats[0]["requests"] == stats[0]["rate_limited"] == 1
+    assert stats[0]["rate_remaining"] == 0
+    assert all(x["requests"] > 5 and not x["in_flight"] for x in stats[1:])
+    assert sum(x["requests"] for x in stats) == len(fake.requests)
+    assert fake.by_token["token-b"] + fake.by_token["token-c"] == len(fake.requests) - 1
+
+    fake.reset()
+    ordered = list(pool._iter_all_tasks("100", order_by="created", reverse=True))
+    assert all("date_created_gt" not in x[2] for x in fake.requests)
+    assert len(ordered) == len([x for x in tasks if x.status.type != "closed"])
+
+    fake.budgets = {"token-a": 0, "token-b": 0, "token-c": 0}
+    with pytest.raises(RateLimited):
+        pool.get("team/100/space")
+    pool.close()
+
+    # pool wide options apply to the pool, the journal only to it
+    fake.budgets = {}
+    path = str(tmp_path / "pool.db")
+    pool = ClickUpPool(
+        ["token-a", "token-b"],
+        api_url=fake.url,
+        cache=False,
+        journal=path,
+        rate_limit=600,
+        adaptive=True,
+    )
+    assert not pool.cache and pool.limiter and pool.rate_limiter.per_minute == 1200
+    assert all(x.journal is None and x.rate_limiter for x in pool.clients)
+    pool.put("task/t1", data={"name": "pooled"})
+    assert pool.journal.flush(timeout=10)
+    assert sum(x["requests"] for x in pool.stats()) == 1
+    pool.close()
+
+
+def test_task_views(fake_client, tmp_path):
+    """testing aggregate views against recomputing them"""
+    views = TaskViews(client=fake_client)
+    views.register("lists", "list")
+    views.register("statuses", "status", value="priority")
+    views.register("people", "assignee")
+    views.register("everything", "all")
+    tasks = list(fake_client._iter_all_tasks("100", include_closed=True))
+    assert views.extend(tasks) == 240
+    views.register("urgency", "priority")
+    with pytest.raises(Exception):
+        views.register("points", "list", value="points")
+
+    def check():
+        for task in tasks:
+            list_id, user_id = task.list["id"], task.assignees[0].id
+            assert views.count("lists", list_id) == len(
+                [x for x in tasks if x.list["id"] == list_id]
+            )
+            assert views.count("people", user_id) == len(
+                [x for x in tasks if user_id in [y.id for y in x.assignees]]
+            )
+        for status in ("open", "closed"):
+            matching = [x for x in tasks if x.status.status.lower() == status]
+            assert views.count("statuses", status) == len(matching)
+            assert views.sum("statuses", status) == sum(x.priority for x in matching)
+        middle = FAKE_BASE_TS + 120 * 60_000
+        due = [
+            int(x._payload["dueDate"])
+            for x in tasks
+            if x._payload.get("dueDate") and x.status.type != "closed"
+        ]
+        assert views.overdue("everything", now=middle) == len(
+            [x for x in due if x < middle]
+        )
+        assert views.count("everything") == len(tasks)
+
+    check()
+    assert views.groups("urgency") == {x: {"count": 48, "sum": 0} for x in range(5)}
+    assert views.overdue("statuses", "closed") == 0
+
+    task = next(x for x in tasks if x.status.type == "open" and not x.due_date)
+    task.update(priority=4, due_date=FAKE_BASE_TS, add_assignees=[4])
+    assert views.count("urgency", 4) == 49 and views.count("people", 4) == 1
+    check()
+    views.remove(tasks.pop(5).id)
+    check()
+
+    path = str(tmp_path / "views.checkpoint")
+    views.save(path)
+    restored = TaskViews.load(path)
+    for name in ("lists", "statuses", "people", "everything", "urgency"):
+        assert restored.groups(name) == views.groups(name)
+    assert restored.overdue("everything") == views.overdue("everything") > 0
+    views.close()
+
+    # due dates are utc, whatever the local timezone
+    now = int(time.time() * 1000)
+    views = TaskViews()
+    views.register("everything", "all")
+    for number, due in ((1, now - 3_600_000), (2, now + 3_600_000)):
+        payload = fake_task(number, "100", "100-1", "100-1-l1")
+        views.add(Task({**payload, "dueDate": str(due)}))
+    assert views.overdue("everything") == 1
@@ -0,0 +1,266 @@
+"""
+concurrency utilities for pyclickup
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional
+
+
+_DONE = object()
+
+
+class RateLimiter:
+    """token bucket limiting how many requests may start per minute"""
+
+    def __init__(self, per_minute: int) -> None:
+        """constructor"""
+        self.per_minute = per_minute
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """blocks until a request is allowed to start"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    float(self.per_minute),
+                    self._tokens + (now - self._updated) * self.per_minute / 60.0,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * 60.0 / self.per_minute
+            time.sleep(wait)
+
+
+def interleave(
+    producers: Iterable[Callable[[], Iterable[Any]]],
+    max_workers: int,
+    buffer: int = 1000,
+) -> Iterator[Any]:
+    """
+    runs each producer in a thread pool of max_workers, yielding items
+    as soon as any producer makes them. at most buffer items are held
+    before producers block, and closing the generator stops them all
+    """
+    results = queue.Queue(maxsize=buffer)  # type: queue.Queue
+    stop = threading.Event()
+
+    def offer(entry: tuple) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def drain(producer: Callable[[], Iterable[Any]]) -> None:
+        if stop.is_set():
+            return
+        try:
+            for item in producer():
+                if not offer((item, None)):
+                    return
+        except Exception as error:
+            offer((_DONE, error))
+            return
+        offer((_DONE, None))
+
+    producers = list(producers)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for producer in producers:
+            pool.submit(drain, producer)
+        remaining = len(producers)
+        try:
+            while remaining:
+                item, error = results.get()
+                if item is _DONE:
+                    remaining -= 1
+                    if error:
+                        raise error
+                    continue
+                yield item
+        finally:
+            stop.set()
+
+
+class _Call:
+    """an in-flight SingleFlight call"""
+
+    def __init__(self) -> None:
+        """constructor"""
+        self.done = threading.Event()
+        self.result = None  # type: Any
+        self.error = None  # type: Optional[BaseException]
+
+
+class SingleFlight:
+    """
+    coalesces concurrent calls with the same key, so only the first caller
+    does the work and everyone waiting on it shares the result (or error).
+    the lock is only held to look up the call, never while it runs
+    """
+
+    def __init__(self) -> None:
+        """constructor"""
+        self._calls = {}  # type: Dict[Hashable, _Call]
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """runs function, or waits for the identical call already running"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on in-flight requests. the limit grows by one for every
+    limit requests that finish without their latency rising above
+    tolerance times the best recently seen, and is cut by decrease on a
+    429 or a latency spike. requests started before the last cut don't
+    cut it again, so one burst of 429s only backs off once
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = 32,
+        decrease: float = 0.5,
+        tolerance: float = 2.0,
+        slack: float = 0.05,  # seconds a request may slow down by regardless
+        window: int = 50,
+    ) -> None:
+        """constructor"""
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.slack = slack
+        self.in_flight = 0
+        self.history = deque(maxlen=1000)  # type: deque
+        self._latencies = deque(maxlen=window)  # type: deque
+        self._successes = 0
+        self._last_cut = 0.0
+        self._condition = threading.Condition()
+        self._record("start")
+
+    def _record(self, reason: str) -> None:
+        """remembers a limit change"""
+        self.history.append((time.time(), int(self.limit), reason))
+
+    def acquire(self) -> float:
+        """blocks until a request may start, returning its start time"""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, started: float, rate_limited: bool = False) -> None:
+        """reports a finished request and adjusts the limit"""
+        latency = time.monotonic() - started
+        with self._condition:
+            self.in_flight -= 1
+            baseline = min(self._latencies) if self._latencies else latency
+            spiked = latency > max(self.tolerance * baseline, baseline + self.slack)
+            if not rate_limited:
+                self._latencies.append(latency)
+            if rate_limited or spiked:
+                if started >= self._last_cut:
+                    self._last_cut = time.monotonic()
+                    self._successes = 0
+                    self.limit = max(float(self.minimum), self.limit * self.decrease)
+                    self._record("429" if rate_limited else "latency")
+            else:
+                self._successes += 1
+                if self._successes >= int(self.limit) and self.limit < self.maximum:
+                    self._successes = 0
+                    self.limit += 1
+                    self._record("increase")
+            self._condition.notify_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        """the current limit, load and history of changes"""
+        with self._condition:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "min_latency": min(self._latencies) if self._latencies else None,
+                "history": list(self.history),
+            }
+
+
+class LatencyTracker:
+    """recent latencies per endpoint, for picking hedge delays"""
+
+    def __init__(self, window: int = 200, minimum_samples: int = 20) -> None:
+        """constructor"""
+        self.window = window
+        self.minimum_samples = minimum_samples
+        self._samples = {}  # type: Dict[str, deque]
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        """adds a latency sample"""
+        with self._lock:
+            samples = self._samples.setdefault(endpoint, deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def percentile(self, endpoint: str, fraction: float = 0.95) -> Optional[float]:
+        """the given percentile, or None until there are enough samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, []))
+        if len(samples) < self.minimum_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class HedgeBudget:
+    """caps hedged requests at a share of all requests"""
+
+    def __init__(self, ratio: float) -> None:
+        """constructor"""
+        self.ratio = ratio
+        self.requests = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def spend(self) -> None:
+        """counts a request"""
+        with self._lock:
+            self.requests += 1
+
+    def allow(self) -> bool:
+        """takes a hedge from the budget if there's room"""
+        with self._lock:
+            if self.hedges + 1 > self.ratio * self.requests:
+                return False
+            self.hedges += 1
+            return True
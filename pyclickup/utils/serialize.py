@@ -0,0 +1,42 @@
+"""
+compact binary encoding of raw api payloads
+"""
+import json
+import zlib
+from typing import Any, List
+
+
+MSGPACK = b"\x01"
+JSON_ZLIB = b"\x02"
+
+
+def _msgpack() -> Any:
+    """msgpack if it's installed, imported on first use"""
+    try:
+        import msgpack  # type: ignore # pylint: disable=import-outside-toplevel
+    except ImportError:  # pragma: no cover
+        return None
+    return msgpack
+
+
+def pack_payloads(payloads: List[dict]) -> bytes:
+    """packs payloads with msgpack if it's installed, otherwise zlib'd json"""
+    msgpack = _msgpack()
+    if msgpack is not None:
+        return MSGPACK + msgpack.packb(payloads, use_bin_type=True)
+    return JSON_ZLIB + zlib.compress(
+        json.dumps(payloads, separators=(",", ":")).encode("utf-8")
+    )
+
+
+def unpack_payloads(blob: bytes) -> List[dict]:
+    """unpacks the output of pack_payloads"""
+    kind, body = blob[:1], blob[1:]
+    if kind == MSGPACK:
+        msgpack = _msgpack()
+        if msgpack is None:
+            raise Exception("this blob was packed with msgpack, which isn't installed")
+        return msgpack.unpackb(body, raw=False)
+    if kind == JSON_ZLIB:
+        return json.loads(zlib.decompress(body).decode("utf-8"))
+    raise Exception("unknown payload encoding")
@@ -3,12 +3,13 @@ text manipulation utilities
 """
 import re
 from datetime import datetime
-from typing import Any
+from typing import Any, Dict, Optional
 
 
 FIRST_CAP = re.compile("(.)([A-Z][a-z]+)")
 ALL_CAP = re.compile("([a-z0-9])([A-Z])")
 LOCALS_FILTER = ["self", "kwargs"]
+ID_SEGMENT = re.compile("[0-9]")
 
 
 def snakeify(text: str) -> str:
@@ -37,3 +38,60 @@ def filter_locals(local_variables: Any, extras: list = None) -> dict:
         for x in local_variables
         if local_variables[x] is not None and x not in var_filter
     }
+
+
+def endpoint_key(path: str) -> str:
+    """an api path with the query dropped and id segments replaced by *"""
+    return "/".join(
+        "*" if ID_SEGMENT.search(x) else x for x in path.split("?")[0].split("/")
+    )
+
+
+def snake_keys(payload: dict) -> dict:
+    """a raw payload with snake_case keys, as the model attributes are named"""
+    return {snakeify(x): y for x, y in payload.items()}
+
+
+def ref_id(value: Any) -> Any:
+    """the id of a nested {"id": ...} reference or model, or a plain value"""
+    if isinstance(value, dict):
+        return value.get("id")
+    return getattr(value, "id", value)
+
+
+def int_or_none(value: Any) -> Optional[int]:
+    """posix x1000 timestamps and the like come back as strings"""
+    return int(value) if value not in (None, "") else None
+
+
+def task_priority(value: Any) -> Optional[int]:
+    """the priority number, from the raw {"id": ...} reference or a plain int"""
+    return int_or_none(ref_id(value))
+
+
+def flat_task(payload: dict) -> Dict[str, Any]:
+    """the scalar fields of a raw task payload, with references as ids"""
+    raw = snake_keys(payload)
+    status = raw.get("status") or {}
+    return {
+        "id": raw.get("id"),
+        "name": raw.get("name"),
+        "content": raw.get("content"),
+        "status": status.get("status"),
+        "status_type": status.get("type"),
+        "priority": task_priority(raw.get("priority")),
+        "team_id": raw.get("team_id"),
+        "space_id": ref_id(raw.get("space")),
+        "project_id": ref_id(raw.get("project")),
+        "list_id": ref_id(raw.get("list")),
+        "parent": ref_id(raw.get("parent")),
+        "assignees": [x.get("id") for x in raw.get("assignees") or []],
+        "tags": [x.get("name", "") for x in raw.get("tags") or []],
+        "creator_id": int_or_none(ref_id(raw.get("creator"))),
+        "date_created": int_or_none(raw.get("date_created")),
+        "date_updated": int_or_none(raw.get("date_updated")),
+        "date_closed": int_or_none(raw.get("date_closed")),
+        "due_date": int_or_none(raw.get("due_date")),
+        "start_date": int_or_none(raw.get("start_date")),
+        "url": raw.get("url"),
+    }
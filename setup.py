@@ -34,6 +34,7 @@ setup(
     license="MIT",
     packages=find_packages(),
     install_requires=INSTALL_REQUIRES,
+    entry_points={"console_scripts": [f"{__library__} = {__library__}.cli:main"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "Programming Language :: Python :: 3.6",